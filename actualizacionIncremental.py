@@ -0,0 +1,618 @@
+# actualizacionIncremental.py
+# Actualización incremental de una gramática ya convertida a CNF.
+# Agregar o quitar una producción de la gramática fuente (p.ej. N -> spoon) solo
+# recalcula las partes afectadas de los anulables, los pares unitarios, los
+# símbolos útiles y las reglas CNF, en lugar de repetir todo el pipeline.
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from gramatica import Gramatica, Symbol, Production, es_no_terminal, parsear_reglas
+from eliminarEpsilonProd import encontrar_anulables, pesos_anulables
+from cnf import _sanear_nombre_terminal
+
+Pesos = Dict[Production, float]
+
+
+class GramaticaIncremental:
+    """
+    Mantiene una gramática fuente (con ε, unarias, etc.) y su versión CNF viva.
+
+    La CNF resultante es equivalente a la de
+        convertir_a_cnf(eliminar_simbolos_inutiles(eliminar_unarias(eliminar_epsilon(fuente))))
+    salvo por los nombres de las variables auxiliares (X_k, T_x).
+
+    Uso:
+        vivo = GramaticaIncremental(procesar_archivo("gramaticas/gramaticaProyecto.txt", "S"))
+        vivo.agregar_reglas(["N -> spoon | ladle"])
+        cyk(vivo.cnf, "she eats the soup with a ladle")
+    """
+    def __init__(self, gramatica: Gramatica):
+        self.fuente = gramatica  # se modifica en el lugar
+
+        # usos[Y][X] = producciones de X (en la fuente) que mencionan a Y
+        self._usos: Dict[Symbol, Dict[Symbol, int]] = {}
+        self.anulables: Set[Symbol] = set()
+        # Mejor peso de A =>* ε para cada anulable (multiplica las variantes sin ε)
+        self.pesos_anulables: Dict[Symbol, float] = {}
+        self._sin_epsilon: Dict[Symbol, Pesos] = {}
+        # origenes[A][v] = {producción fuente de A que genera la variante v: su peso}
+        self._origenes: Dict[Symbol, Dict[Production, Pesos]] = {}
+        # Aristas unitarias A -> B (tras quitar ε) y sus inversas
+        self._unitarias: Dict[Symbol, Dict[Symbol, float]] = {}
+        self._unitarias_inv: Dict[Symbol, Set[Symbol]] = {}
+        # clausura[A][B] = mejor peso de A =>* B por unarias
+        self._clausura: Dict[Symbol, Dict[Symbol, float]] = {}
+        # Producciones no unarias de cada A tras eliminar ε y unarias
+        self._finales: Dict[Symbol, Pesos] = {}
+        self._usos_finales: Dict[Symbol, Dict[Symbol, int]] = {}
+        self.productivos: Set[Symbol] = set()
+        self.alcanzables: Set[Symbol] = set()
+
+        # Estado de la CNF
+        self.cnf = Gramatica()
+        self._emitidas: Dict[Symbol, Dict[Production, Tuple[List[Tuple[Symbol, Production]], List[Symbol]]]] = {}
+        self._usos_terminal: Dict[Symbol, int] = {}
+        self._variables_terminal: Dict[Symbol, Symbol] = {}
+        self._usos_variable_terminal: Dict[Symbol, int] = {}
+        self._auxiliares: Set[Symbol] = set()
+        self._sufijos: Dict[str, int] = {}
+
+        for A, producciones in gramatica.P.items():
+            for produccion in producciones:
+                self._indexar(self._usos, A, produccion, 1)
+
+        self.cnf.S = self._nueva_variable("S0")
+        self.anulables = encontrar_anulables(gramatica)
+        self.pesos_anulables = pesos_anulables(gramatica)
+        self._propagar({A: set() for A in set(gramatica.NT) | set(gramatica.P)}, completo=True)
+
+    # ---------------------------------------------------
+    # API pública
+    # ---------------------------------------------------
+
+    def agregar_produccion(self, no_terminal: Symbol, produccion: Production, peso: Optional[float] = None):
+        self.agregar_producciones([(no_terminal, produccion, peso)])
+
+    def quitar_produccion(self, no_terminal: Symbol, produccion: Production):
+        self.quitar_producciones([(no_terminal, produccion)])
+
+    def agregar_producciones(self, producciones: Iterable[Tuple[Symbol, Production, Optional[float]]]):
+        """
+        Agrega varias producciones (A, produccion, peso) con una sola propagación.
+        Todo el lote se valida antes de modificar nada: si alguna es inválida no
+        se aplica ninguna.
+        """
+        lote = [(A, tuple(produccion), peso) for A, produccion, peso in producciones]
+        # El lote se aplica primero sobre una gramática borrador: así corren las
+        # mismas validaciones de Gramatica.agregar_produccion (lado izquierdo,
+        # símbolos vacíos, pesos) sin tocar la fuente
+        borrador = Gramatica()
+        for A, produccion, peso in lote:
+            self._validar_alta(A, produccion)
+            borrador.agregar_produccion(A, produccion, peso)
+        tocadas: Dict[Symbol, Set[Production]] = {}
+        for A, produccion, peso in lote:
+            self._agregar_fuente(A, produccion, peso)
+            tocadas.setdefault(A, set()).add(produccion)
+        self._propagar(tocadas)
+
+    def quitar_producciones(self, producciones: Iterable[Tuple[Symbol, Production]]):
+        """Quita varias producciones (A, produccion); como en el alta, el lote es todo o nada"""
+        lote = [(A, tuple(produccion)) for A, produccion in producciones]
+        vistas: Set[Tuple[Symbol, Production]] = set()
+        for A, produccion in lote:
+            if produccion not in self.fuente.P.get(A, ()) or (A, produccion) in vistas:
+                raise ValueError(f"No existe la producción {A} -> {' '.join(produccion) or 'ε'}")
+            vistas.add((A, produccion))
+        tocadas: Dict[Symbol, Set[Production]] = {}
+        bajas_anulables = False
+        for A, produccion in lote:
+            bajas_anulables |= self._quitar_fuente(A, produccion)
+            tocadas.setdefault(A, set()).add(produccion)
+        self._propagar(tocadas, recalcular_anulables=bajas_anulables)
+
+    def agregar_reglas(self, lineas: Iterable[str]):
+        """Agrega reglas con la misma sintaxis del archivo de gramática (una sola propagación)"""
+        nuevas = parsear_reglas(lineas, self.fuente.S)
+        self.agregar_producciones(
+            (A, produccion, nuevas.pesos.get((A, produccion)))
+            for A, producciones in nuevas.P.items()
+            for produccion in producciones
+        )
+
+    def quitar_reglas(self, lineas: Iterable[str]):
+        viejas = parsear_reglas(lineas, self.fuente.S)
+        self.quitar_producciones(
+            (A, produccion) for A, producciones in viejas.P.items() for produccion in producciones
+        )
+
+    # ---------------------------------------------------
+    # Gramática fuente e índices
+    # ---------------------------------------------------
+
+    @staticmethod
+    def _indexar(indice: Dict[Symbol, Dict[Symbol, int]], A: Symbol, produccion: Production, delta: int):
+        for Y in set(produccion):
+            if not es_no_terminal(Y):
+                continue
+            por_lhs = indice.setdefault(Y, {})
+            cantidad = por_lhs.get(A, 0) + delta
+            if cantidad > 0:
+                por_lhs[A] = cantidad
+            else:
+                por_lhs.pop(A, None)
+
+    def _validar_alta(self, A: Symbol, produccion: Production):
+        for simbolo in (A,) + produccion:
+            if simbolo in self._auxiliares or simbolo == self.cnf.S:
+                raise ValueError(f"El símbolo '{simbolo}' está reservado por la CNF.")
+
+    def _agregar_fuente(self, A: Symbol, produccion: Production, peso: Optional[float]):
+        if produccion not in self.fuente.P.get(A, ()):
+            self._indexar(self._usos, A, produccion, 1)
+        self.fuente.agregar_produccion(A, produccion, peso)
+
+    def _quitar_fuente(self, A: Symbol, produccion: Production) -> bool:
+        """Quita la producción; indica si podía sostener la anulabilidad de A"""
+        producciones = self.fuente.P[A]
+        producciones.remove(produccion)
+        self.fuente.pesos.pop((A, produccion), None)
+        self._indexar(self._usos, A, produccion, -1)
+        return A in self.anulables and all(s in self.anulables for s in produccion)
+
+    # ---------------------------------------------------
+    # Propagación por etapas
+    # ---------------------------------------------------
+
+    def _propagar(self, tocadas: Dict[Symbol, Set[Production]], completo: bool = False,
+                  recalcular_anulables: bool = False):
+        """
+        Propaga el cambio de las producciones fuente tocadas[A] (agregadas,
+        quitadas o con otro peso). Solo se recalcula completo un A cuando
+        cambió la anulabilidad de algún símbolo que usa.
+        """
+        g = self.fuente
+        cambiados = set(tocadas)
+
+        # 1) Anulables: las altas solo pueden agregar anulables (propagación
+        #    local); una baja que sostenía un anulable obliga a recalcular
+        anterior = set(self.anulables)
+        if recalcular_anulables:
+            self.anulables = encontrar_anulables(g)
+        elif not completo:
+            # Para los A tocados basta mirar las producciones nuevas
+            pendientes = [A for A, producciones in tocadas.items()
+                          if any(p in g.P.get(A, ()) and all(s in self.anulables for s in p)
+                                 for p in producciones)]
+            while pendientes:
+                A = pendientes.pop()
+                if A in self.anulables:
+                    continue
+                if any(all(s in self.anulables for s in p) for p in g.P.get(A, ())):
+                    self.anulables.add(A)
+                    pendientes.extend(self._usos.get(A, {}))
+        cambio_anulables = anterior ^ self.anulables
+
+        #    Pesos de ε: solo pueden cambiar si cambió algún anulable o si se
+        #    tocó una producción formada solo por anulables (p.ej. N0 -> ε [0.5])
+        candidatos_epsilon = anterior | self.anulables
+        if not completo and (cambio_anulables or any(
+                all(s in candidatos_epsilon for s in p)
+                for producciones in tocadas.values() for p in producciones)):
+            pesos_viejos = self.pesos_anulables
+            self.pesos_anulables = pesos_anulables(g)
+            cambio_anulables |= {Y for Y in pesos_viejos.keys() | self.pesos_anulables.keys()
+                                 if pesos_viejos.get(Y) != self.pesos_anulables.get(Y)}
+
+        # 2) Producciones sin ε de los afectados; delta_epsilon[A] son las
+        #    producciones de A que aparecieron, desaparecieron o cambiaron de peso
+        por_anulables: Set[Symbol] = set()
+        for Y in cambio_anulables:
+            por_anulables.update(self._usos.get(Y, {}))
+        afectados_epsilon = set(cambiados) | por_anulables
+        delta_epsilon: Dict[Symbol, Set[Production]] = {}
+        cambio_aristas: Set[Symbol] = set()
+        for A in afectados_epsilon:
+            viejas = self._sin_epsilon.setdefault(A, {})
+            if A not in por_anulables and not completo:
+                delta = self._actualizar_sin_epsilon(A, tocadas[A])
+            else:
+                nuevas = self._calcular_sin_epsilon(A)
+                delta = {p for p in viejas.keys() | nuevas.keys() if viejas.get(p) != nuevas.get(p)}
+                self._sin_epsilon[A] = nuevas
+            if not delta:
+                continue
+            delta_epsilon[A] = delta
+            if any(len(p) == 1 and es_no_terminal(p[0]) for p in delta):
+                self._actualizar_aristas(A)
+                cambio_aristas.add(A)
+
+        # 3) Clausura unitaria y producciones finales: solo cambian los A que
+        #    llegan por unarias a algún símbolo modificado. Si la clausura de A
+        #    no cambió, basta recalcular las producciones del delta.
+        afectados_finales = self._alcance_inverso(set(delta_epsilon) | cambio_aristas)
+        reclausurados = self._alcance_inverso(cambio_aristas)
+        for A in reclausurados:
+            self._clausura[A] = self._calcular_clausura(A)
+        delta_finales: Dict[Symbol, Set[Production]] = {}
+        quitaron: Set[Symbol] = set()  # A que perdieron alguna producción final
+        hubo_bajas = False             # alguna producción final perdida mencionaba NT
+        altas_con_nt: Set[Symbol] = set()
+        for A in afectados_finales:
+            viejas = self._finales.setdefault(A, {})
+            if completo or A in reclausurados:
+                nuevas = self._calcular_finales(A)
+                revisar = viejas.keys() | nuevas.keys()
+            else:
+                clausura = self._clausura.get(A)
+                if clausura is None:
+                    clausura = self._clausura[A] = self._calcular_clausura(A)
+                revisar = set()
+                for B in delta_epsilon:
+                    if B in clausura:
+                        revisar.update(p for p in delta_epsilon[B]
+                                       if not (len(p) == 1 and es_no_terminal(p[0])))
+                nuevas = {p: self._peso_final(A, p) for p in revisar}
+            cambiadas: Set[Production] = set()
+            for p in revisar:
+                antes, despues = viejas.get(p), nuevas.get(p)
+                if antes == despues:
+                    continue
+                cambiadas.add(p)
+                tiene_nt = any(es_no_terminal(s) for s in p)
+                if despues is None:
+                    del viejas[p]
+                    self._indexar(self._usos_finales, A, p, -1)
+                    quitaron.add(A)
+                    hubo_bajas |= tiene_nt
+                else:
+                    if antes is None:
+                        self._indexar(self._usos_finales, A, p, 1)
+                        if tiene_nt:
+                            altas_con_nt.add(A)
+                    viejas[p] = despues
+            if cambiadas:
+                delta_finales[A] = cambiadas
+        cambio_finales = set(delta_finales)
+
+        # 4) Productivos. Si un productivo perdió producciones y no le queda una
+        #    solo de terminales, se invalidan él y los que dependen de él, y se
+        #    vuelven a derivar solo esos (el resto no puede cambiar)
+        anterior_productivos = set(self.productivos)
+        if completo:
+            self.productivos = set()
+            pendientes = list(self._finales)
+        else:
+            dudosos = [A for A in quitaron
+                       if A in self.productivos and not self._tiene_produccion_terminal(A)]
+            invalidados = self._alcance_usos(dudosos)
+            self.productivos -= invalidados
+            pendientes = [A for A in cambio_finales | invalidados if A not in self.productivos]
+        while pendientes:
+            A = pendientes.pop()
+            if A not in self.productivos and self._es_productivo(A):
+                self.productivos.add(A)
+                pendientes.extend(self._usos_finales.get(A, {}))
+        cambio_productivos = anterior_productivos ^ self.productivos
+
+        # 5) Alcanzables desde S (solo por producciones con todos sus NT productivos)
+        anterior_alcanzables = set(self.alcanzables)
+        if completo or hubo_bajas or (anterior_productivos - self.productivos):
+            self.alcanzables = set()
+            semillas = [g.S]
+        else:
+            semillas = [A for A in altas_con_nt | self._lhs_de(cambio_productivos)
+                        if A in self.alcanzables]
+        self._expandir_alcanzables(semillas)
+        cambio_alcanzables = anterior_alcanzables ^ self.alcanzables
+
+        # 6) Reglas CNF: sincronización completa de los A cuyo estado de utilidad
+        #    (o el de algún símbolo que usan) cambió; del resto, solo el delta
+        if completo:
+            completos = set(self._finales) | set(self._emitidas)
+        else:
+            completos = cambio_productivos | cambio_alcanzables | self._lhs_de(cambio_productivos)
+        for A in completos:
+            self._sincronizar(A, A)
+        for A, producciones in delta_finales.items():
+            if A not in completos:
+                self._sincronizar(A, A, producciones)
+        # El inicio de la CNF replica las reglas de S
+        if g.S in completos:
+            self._sincronizar(self.cnf.S, g.S)
+        elif g.S in delta_finales:
+            self._sincronizar(self.cnf.S, g.S, delta_finales[g.S])
+
+        # El símbolo inicial siempre existe, aunque no tenga reglas
+        self.cnf.P.setdefault(self.cnf.S, set())
+        self.cnf.NT.add(self.cnf.S)
+        if g.S not in self.cnf.NT:
+            self.cnf.NT.add(g.S)
+            self.cnf.P.setdefault(g.S, set())
+
+    def _lhs_de(self, simbolos: Set[Symbol]) -> Set[Symbol]:
+        """No terminales con alguna producción final que mencione a los símbolos dados"""
+        resultado: Set[Symbol] = set()
+        for Y in simbolos:
+            resultado.update(self._usos_finales.get(Y, {}))
+        return resultado
+
+    def _alcance_inverso(self, simbolos: Set[Symbol]) -> Set[Symbol]:
+        """Todos los A con A =>* B por unarias para algún B en simbolos"""
+        visitados = set(simbolos)
+        pendientes = list(simbolos)
+        while pendientes:
+            B = pendientes.pop()
+            for A in self._unitarias_inv.get(B, ()):
+                if A not in visitados:
+                    visitados.add(A)
+                    pendientes.append(A)
+        return visitados
+
+    def _variantes(self, produccion: Production) -> Dict[Production, float]:
+        """
+        La producción y todas las que resultan de borrar anulables (sin la
+        vacía), cada una con el factor de peso de derivar ε en lo que se borra.
+        """
+        pos_anulables = [i for i, s in enumerate(produccion)
+                         if s in self.fuente.NT and s in self.anulables]
+        variantes: Dict[Production, float] = {produccion: 1.0} if produccion else {}
+        for r in range(1, len(pos_anulables) + 1):
+            for combo in combinations(pos_anulables, r):
+                variante = tuple(s for i, s in enumerate(produccion) if i not in combo)
+                if variante:
+                    factor = 1.0
+                    for i in combo:
+                        factor *= self.pesos_anulables.get(produccion[i], 1.0)
+                    variantes[variante] = max(variantes.get(variante, 0.0), factor)
+        return variantes
+
+    def _calcular_sin_epsilon(self, A: Symbol) -> Pesos:
+        g = self.fuente
+        origenes: Dict[Production, Pesos] = {}
+        for produccion in g.P.get(A, ()):
+            peso = g.peso(A, produccion)
+            for variante, factor in self._variantes(produccion).items():
+                origenes.setdefault(variante, {})[produccion] = peso * factor
+        self._origenes[A] = origenes
+        return {variante: max(pesos.values()) for variante, pesos in origenes.items()}
+
+    def _actualizar_sin_epsilon(self, A: Symbol, producciones: Set[Production]) -> Set[Production]:
+        """
+        Actualiza solo las variantes de las producciones fuente indicadas
+        (la anulabilidad de sus símbolos no cambió). Devuelve las variantes
+        cuyo peso cambió o que aparecieron/desaparecieron.
+        """
+        g = self.fuente
+        origenes = self._origenes.setdefault(A, {})
+        actuales = self._sin_epsilon[A]
+        delta: Set[Production] = set()
+        for produccion in producciones:
+            for variante, factor in self._variantes(produccion).items():
+                pesos = origenes.setdefault(variante, {})
+                pesos.pop(produccion, None)
+                if produccion in g.P.get(A, ()):
+                    pesos[produccion] = g.peso(A, produccion) * factor
+                nuevo = max(pesos.values()) if pesos else None
+                if not pesos:
+                    del origenes[variante]
+                if actuales.get(variante) != nuevo:
+                    delta.add(variante)
+                    if nuevo is None:
+                        del actuales[variante]
+                    else:
+                        actuales[variante] = nuevo
+        return delta
+
+    def _actualizar_aristas(self, A: Symbol):
+        aristas = {p[0]: peso for p, peso in self._sin_epsilon[A].items()
+                   if len(p) == 1 and es_no_terminal(p[0])}
+        for B in self._unitarias.get(A, {}):
+            self._unitarias_inv.get(B, set()).discard(A)
+        for B in aristas:
+            self._unitarias_inv.setdefault(B, set()).add(A)
+        self._unitarias[A] = aristas
+
+    def _calcular_clausura(self, A: Symbol) -> Dict[Symbol, float]:
+        mejores: Dict[Symbol, float] = {A: 1.0}
+        # Relajación acotada, igual que pesos_pares_unitarios
+        for _ in range(len(self._unitarias) + 1):
+            cambio = False
+            for B, peso_B in list(mejores.items()):
+                for C, peso in self._unitarias.get(B, {}).items():
+                    if peso_B * peso > mejores.get(C, 0.0):
+                        mejores[C] = peso_B * peso
+                        cambio = True
+            if not cambio:
+                break
+        return mejores
+
+    def _peso_final(self, A: Symbol, produccion: Production) -> Optional[float]:
+        """Peso de A -> produccion tras eliminar unarias (None si no existe)"""
+        mejor = None
+        for B, peso_B in self._clausura[A].items():
+            peso = self._sin_epsilon.get(B, {}).get(produccion)
+            if peso is not None and (mejor is None or peso_B * peso > mejor):
+                mejor = peso_B * peso
+        return mejor
+
+    def _calcular_finales(self, A: Symbol) -> Pesos:
+        clausura = self._clausura.get(A)
+        if clausura is None:
+            clausura = self._clausura[A] = self._calcular_clausura(A)
+        resultado: Pesos = {}
+        for B, peso_B in clausura.items():
+            for produccion, peso in self._sin_epsilon.get(B, {}).items():
+                if len(produccion) == 1 and es_no_terminal(produccion[0]):
+                    continue
+                resultado[produccion] = max(resultado.get(produccion, 0.0), peso_B * peso)
+        return resultado
+
+    def _alcance_usos(self, simbolos: List[Symbol]) -> Set[Symbol]:
+        """Los símbolos dados y todos los que los usan, directa o indirectamente"""
+        visitados = set(simbolos)
+        pendientes = list(simbolos)
+        while pendientes:
+            Y = pendientes.pop()
+            for A in self._usos_finales.get(Y, {}):
+                if A not in visitados:
+                    visitados.add(A)
+                    pendientes.append(A)
+        return visitados
+
+    def _tiene_produccion_terminal(self, A: Symbol) -> bool:
+        return any(not any(es_no_terminal(s) for s in p) for p in self._finales.get(A, {}))
+
+    def _es_productivo(self, A: Symbol) -> bool:
+        return any(
+            all(not es_no_terminal(s) or s in self.productivos for s in p)
+            for p in self._finales.get(A, {})
+        )
+
+    def _expandir_alcanzables(self, semillas: List[Symbol]):
+        pendientes = list(semillas)
+        if self.fuente.S is not None:
+            self.alcanzables.add(self.fuente.S)
+        while pendientes:
+            A = pendientes.pop()
+            if A not in self.productivos:
+                continue
+            for produccion in self._finales.get(A, {}):
+                if not all(not es_no_terminal(s) or s in self.productivos for s in produccion):
+                    continue
+                for s in produccion:
+                    if es_no_terminal(s) and s not in self.alcanzables:
+                        self.alcanzables.add(s)
+                        pendientes.append(s)
+
+    # ---------------------------------------------------
+    # Reglas CNF
+    # ---------------------------------------------------
+
+    def _deseada(self, origen: Symbol, produccion: Production) -> Optional[float]:
+        """Peso con que origen -> produccion debe estar en la CNF (None si no debe estar)"""
+        if origen not in self.productivos or origen not in self.alcanzables:
+            return None
+        peso = self._finales.get(origen, {}).get(produccion)
+        if peso is None or any(es_no_terminal(s) and s not in self.productivos for s in produccion):
+            return None
+        return peso
+
+    def _sincronizar(self, lhs: Symbol, origen: Symbol,
+                     producciones: Optional[Set[Production]] = None):
+        """
+        Deja en la CNF, bajo lhs, exactamente las reglas que corresponden a las
+        producciones finales de origen (solo las indicadas, si se pasan).
+        """
+        emitidas = self._emitidas.setdefault(lhs, {})
+        if producciones is None:
+            producciones = set(emitidas) | set(self._finales.get(origen, {}))
+        for produccion in producciones:
+            peso = self._deseada(origen, produccion)
+            if produccion in emitidas:
+                if peso is None:
+                    self._retirar(lhs, produccion)
+                elif self.cnf.peso(*emitidas[produccion][0][0]) != peso:
+                    self._fijar_peso(emitidas[produccion][0][0], peso)
+            elif peso is not None:
+                self._emitir(lhs, produccion, peso)
+
+        if emitidas or lhs == self.cnf.S:
+            self.cnf.NT.add(lhs)
+            self.cnf.P.setdefault(lhs, set())
+        else:
+            self._emitidas.pop(lhs, None)
+            if lhs != self.fuente.S:
+                self.cnf.NT.discard(lhs)
+                self.cnf.P.pop(lhs, None)
+
+    def _fijar_peso(self, regla: Tuple[Symbol, Production], peso: float):
+        if peso == 1.0:
+            self.cnf.pesos.pop(regla, None)
+        else:
+            self.cnf.pesos[regla] = peso
+
+    def _nueva_variable(self, base: str) -> Symbol:
+        k = self._sufijos.get(base, 1)
+        nombre = base if k == 1 else f"{base}_{k}"
+        while (nombre in self.fuente.NT or nombre in self.fuente.T
+               or nombre in self.cnf.NT or nombre in self.cnf.P):
+            k += 1
+            nombre = f"{base}_{k}"
+        self._sufijos[base] = k + 1
+        return nombre
+
+    def _agregar_regla_cnf(self, A: Symbol, produccion: Production):
+        self.cnf.NT.add(A)
+        self.cnf.P.setdefault(A, set()).add(produccion)
+        for s in produccion:
+            if not es_no_terminal(s):
+                self._usos_terminal[s] = self._usos_terminal.get(s, 0) + 1
+                self.cnf.T.add(s)
+
+    def _quitar_regla_cnf(self, A: Symbol, produccion: Production):
+        self.cnf.P.get(A, set()).discard(produccion)
+        self.cnf.pesos.pop((A, produccion), None)
+        for s in produccion:
+            if not es_no_terminal(s):
+                self._usos_terminal[s] -= 1
+                if self._usos_terminal[s] == 0:
+                    del self._usos_terminal[s]
+                    self.cnf.T.discard(s)
+
+    def _variable_terminal(self, t: Symbol) -> Symbol:
+        var = self._variables_terminal.get(t)
+        if var is None:
+            var = self._nueva_variable(f"T_{_sanear_nombre_terminal(t)}")
+            self._variables_terminal[t] = var
+            self._auxiliares.add(var)
+            self._agregar_regla_cnf(var, (t,))
+        self._usos_variable_terminal[var] = self._usos_variable_terminal.get(var, 0) + 1
+        return var
+
+    def _soltar_variable_terminal(self, var: Symbol):
+        self._usos_variable_terminal[var] -= 1
+        if self._usos_variable_terminal[var] == 0:
+            del self._usos_variable_terminal[var]
+            (t,), = self.cnf.P[var]
+            self._quitar_regla_cnf(var, (t,))
+            del self._variables_terminal[t]
+            self._auxiliares.discard(var)
+            self.cnf.NT.discard(var)
+            self.cnf.P.pop(var, None)
+
+    def _emitir(self, A: Symbol, produccion: Production, peso: float):
+        """Convierte una producción final a reglas CNF (T_x y binarización)"""
+        reglas: List[Tuple[Symbol, Production]] = []
+        auxiliares: List[Symbol] = []
+        if len(produccion) == 1:
+            reglas.append((A, produccion))
+        else:
+            simbolos = [s if es_no_terminal(s) else self._variable_terminal(s) for s in produccion]
+            izquierda = A
+            while len(simbolos) > 2:
+                Z = self._nueva_variable("X")
+                self._auxiliares.add(Z)
+                auxiliares.append(Z)
+                reglas.append((izquierda, (simbolos[0], Z)))
+                izquierda = Z
+                simbolos = simbolos[1:]
+            reglas.append((izquierda, tuple(simbolos)))
+        for lhs, rhs in reglas:
+            self._agregar_regla_cnf(lhs, rhs)
+        self._fijar_peso(reglas[0], peso)
+        self._emitidas[A][produccion] = (reglas, auxiliares)
+
+    def _retirar(self, A: Symbol, produccion: Production):
+        reglas, auxiliares = self._emitidas[A].pop(produccion)
+        for lhs, rhs in reglas:
+            self._quitar_regla_cnf(lhs, rhs)
+        for Z in auxiliares:
+            self._auxiliares.discard(Z)
+            self.cnf.NT.discard(Z)
+            self.cnf.P.pop(Z, None)
+        if len(produccion) > 1:
+            for s in produccion:
+                if not es_no_terminal(s):
+                    self._soltar_variable_terminal(self._variables_terminal[s])
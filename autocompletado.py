@@ -0,0 +1,225 @@
+# autocompletado.py
+# Análisis de prefijos para autocompletar: a medida que se escriben tokens dice
+# si el prefijo todavía puede extenderse a una oración del lenguaje y qué
+# terminales pueden venir a continuación.
+#
+# Se mantiene una tabla CYK de bitsets que crece una columna por token.
+# Con ella se calcula, para el prefijo w[0:n],
+#     pendientes = { X : S =>* w[0:n] X γ }   (derivación por la izquierda)
+# y los terminales siguientes son los que empiezan a algún X pendiente.
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from gramatica import Gramatica, Symbol
+from cykParalelo import GramaticaCompilada, _combinar
+from tokenizador import Tokenizador, TokenizadorEspacios, IndiceLexico, tokenizar
+
+
+def _bits(mascara: int):
+    """Índices de los bits encendidos de la máscara"""
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+class AnalizadorPrefijos:
+    """
+    Estado de análisis de un prefijo que se edita token a token.
+
+    La gramática debe estar en CNF y sin símbolos inútiles (la salida de la
+    normalización de main.py). Ni agregar_token() ni las consultas recorren
+    el léxico: el costo depende de la longitud del prefijo y de las reglas
+    binarias, y el léxico solo se consulta por diccionario.
+    """
+    def __init__(self, gramatica: Gramatica, tokenizador: Optional[Tokenizador] = None):
+        self.tokenizador = tokenizador if tokenizador is not None else TokenizadorEspacios()
+        # Índice con el mismo plegado de mayúsculas que los tokens
+        self._lexico = IndiceLexico(gramatica, minusculas=self.tokenizador.minusculas)
+        self.compilada = GramaticaCompilada(gramatica, self._lexico)
+        simbolos = self.compilada.simbolos
+        indice = {A: b for b, A in enumerate(simbolos)}
+        cantidad = len(simbolos)
+
+        # lexicas[a] = máscara de los A con A -> a
+        self._lexicas: Dict[str, int] = {}
+        # terminales[A] = terminales a con A -> a, ordenados para buscar por prefijo
+        self._terminales: List[List[str]] = [[] for _ in range(cantidad)]
+        for terminal, no_terminales in self._lexico.no_terminales.items():
+            mascara = 0
+            for A in no_terminales:
+                mascara |= 1 << indice[A]
+                self._terminales[indice[A]].append(terminal)
+            self._lexicas[terminal] = mascara
+        for terminales in self._terminales:
+            terminales.sort()
+        preterminales = 0
+        for mascara in self._lexicas.values():
+            preterminales |= mascara
+
+        # reglas[B] = [(A, C), ...] para A -> B C
+        self._reglas: List[List[Tuple[int, int]]] = [[] for _ in range(cantidad)]
+        for b, por_c in enumerate(self.compilada.binarias):
+            for c, mascara in por_c:
+                for a in _bits(mascara):
+                    self._reglas[b].append((a, c))
+
+        # esquina[X] = { Y : X =>* Y γ } (esquina izquierda, reflexiva y transitiva)
+        esquina = [1 << x for x in range(cantidad)]
+        cambio = True
+        while cambio:
+            cambio = False
+            for b, reglas in enumerate(self._reglas):
+                for a, _ in reglas:
+                    nueva = esquina[a] | esquina[b]
+                    if nueva != esquina[a]:
+                        esquina[a] = nueva
+                        cambio = True
+        # ancestros[Y] = { X : X =>* Y γ }
+        self._ancestros: List[List[int]] = [[] for _ in range(cantidad)]
+        self._mascara_ancestros: List[int] = [0] * cantidad
+        for x in range(cantidad):
+            for y in _bits(esquina[x]):
+                self._ancestros[y].append(x)
+                self._mascara_ancestros[y] |= 1 << x
+        # primeros[X] = preterminales con los que puede empezar X (FIRST a nivel de A -> a)
+        self._primeros: List[int] = [esquina[x] & preterminales for x in range(cantidad)]
+
+        self._inicial = self.compilada.bit_inicial
+        self.reiniciar()
+
+    # ---------------------------------------------------
+    # Edición del prefijo
+    # ---------------------------------------------------
+
+    def reiniciar(self):
+        self.tokens: List[str] = []
+        # columnas[j][i] = máscara de los A que derivan w[i:j]
+        self._columnas: List[List[int]] = [[]]
+        # pendientes[n] = máscara de X con S =>* w[0:n] X γ
+        self._pendientes: List[int] = [0 if self._inicial is None else 1 << self._inicial]
+
+    def agregar_token(self, token: str):
+        """Agrega un token al final del prefijo (una columna nueva de la tabla)"""
+        token = self.tokenizador.normalizar(token)
+        n = len(self.tokens)
+        columna = [0] * (n + 1)
+        columna[n] = self._lexicas.get(token, 0)
+        for i in range(n - 1, -1, -1):
+            celda = 0
+            for k in range(i + 1, n + 1):
+                izquierda = self._columnas[k][i]
+                derecha = columna[k]
+                if izquierda and derecha:
+                    celda |= _combinar(self.compilada, izquierda, derecha)
+            columna[i] = celda
+        self.tokens.append(token)
+        self._columnas.append(columna)
+        self._pendientes.append(self._calcular_pendientes())
+
+    def agregar_tokens(self, cadena: str):
+        for token in tokenizar(cadena, self.tokenizador):
+            self.agregar_token(token)
+
+    def borrar_token(self) -> Optional[str]:
+        """Quita el último token (retroceso); el estado anterior ya estaba guardado"""
+        if not self.tokens:
+            return None
+        self._columnas.pop()
+        self._pendientes.pop()
+        return self.tokens.pop()
+
+    def _calcular_pendientes(self) -> int:
+        """
+        E(i, A) = { X : A =>* w[i:n] X γ }, de i = n-1 hacia 0. Para A -> B C:
+          - B deriva w[i:n] completo          -> X = C
+          - B deriva w[i:k] con i < k < n     -> X en E(k, C)
+          - B deriva w[i:n] dejando pendiente -> X en E(i, B)
+        El último caso se resuelve con la esquina izquierda: E(i, A) es la unión
+        de los casos anteriores para todo Y con A =>* Y γ.
+        """
+        n = len(self.tokens)
+        columnas = self._columnas
+        E: List[Dict[int, int]] = [{} for _ in range(n)]
+        for i in range(n - 1, -1, -1):
+            base: Dict[int, int] = {}
+            for k in range(i + 1, n + 1):
+                izquierda = columnas[k][i]
+                if not izquierda:
+                    continue
+                if k == n:
+                    for b in _bits(izquierda):
+                        for a, c in self._reglas[b]:
+                            base[a] = base.get(a, 0) | (1 << c)
+                    continue
+                siguiente = E[k]
+                if not siguiente:
+                    continue
+                for b in _bits(izquierda):
+                    for a, c in self._reglas[b]:
+                        mascara = siguiente.get(c)
+                        if mascara:
+                            base[a] = base.get(a, 0) | mascara
+            actual = E[i]
+            for y, mascara in base.items():
+                for a in self._ancestros[y]:
+                    actual[a] = actual.get(a, 0) | mascara
+        if n == 0 or self._inicial is None:
+            return 0
+        return E[0].get(self._inicial, 0)
+
+    # ---------------------------------------------------
+    # Consultas
+    # ---------------------------------------------------
+
+    def acepta(self) -> bool:
+        """El prefijo completo es una oración del lenguaje"""
+        if not self.tokens or self._inicial is None:
+            return False
+        return bool((self._columnas[-1][0] >> self._inicial) & 1)
+
+    def es_viable(self) -> bool:
+        """El prefijo es una oración o puede extenderse hasta serlo"""
+        return bool(self._pendientes[-1]) or self.acepta()
+
+    def es_terminal_valido(self, terminal: str) -> bool:
+        """El terminal puede ser el siguiente token (sin recorrer el léxico)"""
+        pendientes = self._pendientes[-1]
+        for a in _bits(self._lexicas.get(self.tokenizador.normalizar(terminal), 0)):
+            if pendientes & self._mascara_ancestros[a]:
+                return True
+        return False
+
+    def siguientes_preterminales(self) -> List[Symbol]:
+        """No terminales A (con A -> a) que pueden generar el siguiente token"""
+        return [self.compilada.simbolos[a] for a in _bits(self._mascara_siguientes())]
+
+    def _mascara_siguientes(self) -> int:
+        mascara = 0
+        for x in _bits(self._pendientes[-1]):
+            mascara |= self._primeros[x]
+        return mascara
+
+    def siguientes_terminales(self, parcial: str = "", limite: Optional[int] = None) -> List[str]:
+        """
+        Terminales que pueden venir a continuación y empiezan con parcial
+        (la palabra que se está escribiendo), en orden alfabético.
+
+        Cada preterminal se busca por bisección, así que el costo depende de
+        cuántos resultados se piden (limite) y no del tamaño del léxico.
+        """
+        parcial = self.tokenizador.normalizar(parcial)
+        encontrados = set()
+        for a in _bits(self._mascara_siguientes()):
+            terminales = self._terminales[a]
+            posicion = bisect_left(terminales, parcial)
+            tomados = 0
+            while posicion < len(terminales) and terminales[posicion].startswith(parcial):
+                if limite is not None and tomados >= limite:
+                    break
+                encontrados.add(terminales[posicion])
+                posicion += 1
+                tomados += 1
+        resultado = sorted(encontrados)
+        return resultado if limite is None else resultado[:limite]
@@ -0,0 +1,303 @@
+# benchmarks.py
+# Mediciones de rendimiento de los distintos modos de análisis
+
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from gramatica import procesar_archivo, parsear_reglas, Gramatica
+from eliminarEpsilonProd import eliminar_epsilon
+from eliminarUnariasProd import eliminar_unarias
+from eliminarSimbolosInutiles import eliminar_simbolos_inutiles
+from cnf import convertir_a_cnf
+from cyk import cyk, cyk_viterbi, contar_arboles, Derivacion, ResultadoCYK
+from exportar import escribir_penn, escribir_json
+from cykParalelo import CYKParalelo
+from cykDisperso import cyk_disperso
+from tokenizador import IndiceLexico
+from autocompletado import AnalizadorPrefijos
+from pipelineNormalizacion import PipelineNormalizacion
+from actualizacionIncremental import GramaticaIncremental
+
+
+def cargar_cnf(archivo: str, inicio: str = "S") -> Gramatica:
+    gramatica = procesar_archivo(archivo, inicio)
+    gramatica = eliminar_epsilon(gramatica)
+    gramatica = eliminar_unarias(gramatica)
+    gramatica = eliminar_simbolos_inutiles(gramatica)
+    return convertir_a_cnf(gramatica)
+
+
+def oracion_ambigua(adjuntos: int) -> str:
+    """
+    'she eats a cake with a fork with a fork ...'. Solo es ambigua si la
+    gramática permite NP -> NP PP (gramaticaAmbiguaPesos.txt): ahí el número
+    de árboles crece como Catalan. Con gramaticaProyecto.txt tiene un solo árbol.
+    """
+    return "she eats a cake" + " with a fork" * adjuntos
+
+
+def _medir(funcion, *args, **kwargs) -> float:
+    inicio = time.perf_counter()
+    funcion(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+
+def benchmark_viterbi():
+    # Gramática ambigua (NP -> NP PP): el modo exhaustivo materializa todos los árboles
+    gramatica = cargar_cnf("gramaticas/gramaticaAmbiguaPesos.txt")
+    print(f"{'tokens':>6} {'árboles':>14} {'exhaustivo':>12} {'viterbi':>12} {'beam=1':>12}")
+    for adjuntos in (0, 2, 4, 6, 8, 10, 20, 40):
+        oracion = oracion_ambigua(adjuntos)
+        tokens = len(oracion.split())
+        total = contar_arboles(gramatica, oracion).total
+        arboles = str(total) if total < 10**12 else f"~10^{len(str(total)) - 1}"
+        # El modo exhaustivo crece como el número de árboles; solo se mide en oraciones cortas
+        exhaustivo = f"{_medir(cyk, gramatica, oracion):.4f}s" if adjuntos <= 10 else "-"
+        viterbi = _medir(cyk_viterbi, gramatica, oracion)
+        beam = _medir(cyk_viterbi, gramatica, oracion, beam=1)
+        print(f"{tokens:>6} {arboles:>14} {exhaustivo:>12} {viterbi:>11.4f}s {beam:>11.4f}s")
+
+
+def benchmark_conteo():
+    # S -> S S | a: la cadena a^n tiene Catalan(n-1) árboles
+    gramatica = convertir_a_cnf(parsear_reglas(["S -> S S | a"], "S"))
+    print(f"{'tokens':>6} {'árboles':>14} {'exhaustivo':>12} {'conteo':>12}")
+    for n in (4, 8, 10, 12, 13, 50, 200):
+        oracion = " ".join(["a"] * n)
+        exhaustivo = f"{_medir(cyk, gramatica, oracion):.4f}s" if n <= 13 else "-"
+        inicio = time.perf_counter()
+        total = contar_arboles(gramatica, oracion).total
+        conteo = time.perf_counter() - inicio
+        arboles = str(total) if total < 10**12 else f"~10^{len(str(total)) - 1}"
+        print(f"{n:>6} {arboles:>14} {exhaustivo:>12} {conteo:>11.4f}s")
+
+
+def oracion_larga(tokens: int) -> str:
+    """Oración aceptada de aproximadamente la longitud pedida"""
+    return oracion_ambigua(max(0, (tokens - 4) // 3))
+
+
+def benchmark_paralelo():
+    gramatica = cargar_cnf("gramaticas/gramaticaProyecto.txt")
+    nucleos = os.cpu_count() or 1
+    procesos = sorted({1, 2, 4, nucleos})
+    print(f"núcleos disponibles: {nucleos}")
+    print(f"{'tokens':>6} " + " ".join(f"{f'p={p}':>10}" for p in procesos) + f" {'speedup':>8}")
+    for tokens in (200, 350, 500):
+        oracion = oracion_larga(tokens)
+        tiempos = []
+        for p in procesos:
+            with CYKParalelo(gramatica, procesos=p, umbral_serial=1) as motor:
+                motor.cyk("she eats")  # arrancar el pool fuera de la medición
+                tiempos.append(_medir(motor.cyk, oracion))
+        columnas = " ".join(f"{t:>9.3f}s" for t in tiempos)
+        print(f"{len(oracion.split()):>6} {columnas} {tiempos[0] / min(tiempos):>7.2f}x")
+
+    # Cruce: primera longitud en la que el pool con todos los núcleos gana al serial
+    cruce = None
+    with CYKParalelo(gramatica, procesos=1) as serial, \
+         CYKParalelo(gramatica, procesos=max(nucleos, 2), umbral_serial=1) as paralelo:
+        paralelo.cyk("she eats")
+        for tokens in (25, 50, 100, 150, 200, 300):
+            oracion = oracion_larga(tokens)
+            if _medir(paralelo.cyk, oracion) < _medir(serial.cyk, oracion):
+                cruce = len(oracion.split())
+                break
+    print(f"longitud de cruce: {cruce if cruce else 'no se alcanzó (usar siempre el motor serial)'}")
+
+
+def gramatica_sintetica(no_terminales: int, terminales: int = 200, semilla: int = 0) -> list:
+    """Reglas aleatorias con ε, unarias, terminales y producciones largas"""
+    azar = random.Random(semilla)
+    nts = ["S"] + [f"N{i}" for i in range(no_terminales)]
+    ts = [f"w{i}" for i in range(terminales)]
+    lineas = []
+    for A in nts:
+        alternativas = []
+        for _ in range(azar.randint(2, 6)):
+            largo = azar.choice([0, 1, 1, 2, 2, 3, 4])
+            simbolos = [azar.choice(nts) if azar.random() < 0.6 else azar.choice(ts) for _ in range(largo)]
+            alternativas.append(" ".join(simbolos) or "ε")
+        lineas.append(f"{A} -> " + " | ".join(alternativas))
+    return lineas
+
+
+def _medir_memoria(funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tiempo, pico
+
+
+def benchmark_pipeline():
+    print(f"{'NT':>6} {'cadena main.py':>24} {'pipeline':>24}")
+    for no_terminales in (50, 100, 200):
+        lineas = gramatica_sintetica(no_terminales)
+
+        def cadena():
+            gramatica = parsear_reglas(lineas, "S")
+            gramatica = eliminar_epsilon(gramatica)
+            gramatica = eliminar_unarias(gramatica)
+            gramatica = eliminar_simbolos_inutiles(gramatica)
+            return convertir_a_cnf(gramatica)
+
+        def pipeline():
+            motor = PipelineNormalizacion(parsear_reglas(lineas, "S"))
+            motor.ejecutar()
+            return motor.gramatica
+
+        _, t_cadena, m_cadena = _medir_memoria(cadena)
+        _, t_pipeline, m_pipeline = _medir_memoria(pipeline)
+        print(f"{no_terminales:>6} {t_cadena:>10.2f}s {m_cadena / 2**20:>10.1f} MiB"
+              f" {t_pipeline:>10.2f}s {m_pipeline / 2**20:>10.1f} MiB")
+
+
+def benchmark_incremental():
+    with open("gramaticas/gramaticaProyecto.txt", encoding="utf-8") as archivo:
+        proyecto = archivo.read().splitlines()
+    lexicon = proyecto + ["N -> " + " | ".join(f"palabra{i}" for i in range(20000))]
+    casos = [
+        ("proyecto+20k", lexicon, ["N -> spork"], ["VP -> V NP"]),
+        ("sint. 50", gramatica_sintetica(50), ["N3 -> palabra_nueva"], ["N7 -> N1 w3 N2 | N4"]),
+        ("sint. 200", gramatica_sintetica(200), ["N3 -> palabra_nueva"], ["N7 -> N1 w3 N2 | N4"]),
+    ]
+    print(f"{'gramática':>13} {'recompilar':>11} {'+palabra':>10} {'-palabra':>10} {'+regla':>10}")
+    for nombre, lineas, palabra, regla in casos:
+        def recompilar():
+            motor = PipelineNormalizacion(parsear_reglas(lineas, "S"))
+            motor.ejecutar()
+
+        vivo = GramaticaIncremental(parsear_reglas(lineas, "S"))
+        t_palabra = _medir(vivo.agregar_reglas, palabra)
+        t_quitar = _medir(vivo.quitar_reglas, palabra)
+        t_regla = _medir(vivo.agregar_reglas, regla)
+        t_total = _medir(recompilar)
+        print(f"{nombre:>13} {t_total:>10.3f}s {t_palabra * 1000:>8.3f}ms"
+              f" {t_quitar * 1000:>8.3f}ms {t_regla * 1000:>8.3f}ms")
+
+
+def arbol_profundo(profundidad: int) -> Derivacion:
+    """Árbol ramificado a la derecha: S -> T_a S en cada nivel"""
+    nodo = Derivacion("S", terminal="a")
+    for _ in range(profundidad):
+        nodo = Derivacion("S", hijos=[Derivacion("T_a", terminal="a"), nodo])
+    return nodo
+
+
+def benchmark_render():
+    print(f"{'profundidad':>11} {'árbol':>10} {'penn':>10} {'json':>10}")
+    for profundidad in (500, 2000, 8000):
+        resultado = ResultadoCYK(False, 0.0)
+        arbol = arbol_profundo(profundidad)
+        t_arbol = _medir(resultado.escribir_parse_tree, arbol, io.StringIO())
+        t_penn = _medir(escribir_penn, arbol, io.StringIO())
+        t_json = _medir(escribir_json, arbol, io.StringIO())
+        print(f"{profundidad:>11} {t_arbol:>9.4f}s {t_penn:>9.4f}s {t_json:>9.4f}s")
+
+
+def benchmark_disperso():
+    # Oraciones válidas concatenadas: se rechazan y casi todas las celdas quedan vacías
+    gramatica = cargar_cnf("gramaticas/gramaticaProyecto.txt")
+    print(f"{'tokens':>6} {'denso':>12} {'disperso':>12}")
+    for repeticiones in (10, 30, 60, 120):
+        oracion = " ".join(["she eats a cake with a fork"] * repeticiones)
+        denso = f"{_medir(cyk, gramatica, oracion):.4f}s" if repeticiones <= 60 else "-"
+        disperso = _medir(cyk_disperso, gramatica, oracion)
+        print(f"{len(oracion.split()):>6} {denso:>12} {disperso:>11.4f}s")
+
+
+def _paso_lexico_escaneo(gramatica: Gramatica, palabras: list) -> list:
+    """Paso 1 como lo hacía cyk() antes del índice: recorre todas las producciones por palabra"""
+    fila = []
+    for palabra in palabras:
+        encontradas = []
+        for A, producciones in gramatica.P.items():
+            for produccion in producciones:
+                if len(produccion) == 1 and produccion[0] == palabra:
+                    encontradas.append(A)
+        fila.append(encontradas)
+    return fila
+
+
+def _paso_lexico_indice(indice: IndiceLexico, palabras: list) -> list:
+    return [indice.buscar(palabra) for palabra in palabras]
+
+
+def benchmark_lexico():
+    # Misma oración (20 tokens) con léxicos cada vez más grandes
+    with open("gramaticas/gramaticaProyecto.txt", encoding="utf-8") as archivo:
+        proyecto = archivo.read().splitlines()
+    oracion = oracion_ambigua(2) + " with a palabra7"
+    palabras_oracion = oracion.split()
+    print(f"{'léxico':>8} {'paso 1 escaneo':>15} {'paso 1 índice':>14} {'compilar':>10}"
+          f" {'cyk':>10} {'cyk+índice':>11} {'conteo+índice':>14}")
+    for palabras in (1000, 10000, 50000):
+        lineas = proyecto + ["N -> " + " | ".join(f"palabra{i}" for i in range(palabras))]
+        gramatica = convertir_a_cnf(parsear_reglas(lineas, "S"))
+        inicio = time.perf_counter()
+        indice = IndiceLexico(gramatica, minusculas=True)
+        t_indice = time.perf_counter() - inicio
+        t_escaneo = _medir(_paso_lexico_escaneo, gramatica, palabras_oracion)
+        t_busqueda = _medir(_paso_lexico_indice, indice, palabras_oracion)
+        t_cyk = _medir(cyk, gramatica, oracion)
+        t_indexado = _medir(cyk, gramatica, oracion, indice=indice)
+        t_conteo = _medir(contar_arboles, gramatica, oracion, indice=indice)
+        print(f"{palabras:>8} {t_escaneo * 1000:>13.2f}ms {t_busqueda * 1000:>12.3f}ms"
+              f" {t_indice * 1000:>8.2f}ms {t_cyk * 1000:>8.2f}ms {t_indexado * 1000:>9.2f}ms"
+              f" {t_conteo * 1000:>12.2f}ms")
+
+
+def benchmark_autocompletado():
+    # Latencia por token al escribir una oración de 20 tokens con léxicos crecientes
+    with open("gramaticas/gramaticaProyecto.txt", encoding="utf-8") as archivo:
+        proyecto = archivo.read().splitlines()
+    tokens = (oracion_ambigua(2) + " with a palabra7").split()
+    print(f"{'léxico':>8} {'compilar':>10} {'token prom.':>12} {'token máx.':>11}"
+          f" {'sugerir':>10} {'borrar':>10}")
+    for palabras in (1000, 10000, 50000):
+        lineas = proyecto + ["N -> " + " | ".join(f"palabra{i}" for i in range(palabras))]
+        gramatica = convertir_a_cnf(parsear_reglas(lineas, "S"))
+        inicio = time.perf_counter()
+        analizador = AnalizadorPrefijos(gramatica)
+        t_compilar = time.perf_counter() - inicio
+
+        # Cada token: agregar la columna y responder si el prefijo sigue siendo viable
+        latencias = []
+        for token in tokens:
+            inicio = time.perf_counter()
+            analizador.agregar_token(token)
+            analizador.es_viable()
+            latencias.append(time.perf_counter() - inicio)
+        analizador.borrar_token()
+        analizador.borrar_token()
+        t_sugerir = _medir(analizador.siguientes_terminales, "palabra1", limite=10)
+        t_borrar = _medir(analizador.borrar_token)
+        print(f"{palabras:>8} {t_compilar * 1000:>8.1f}ms"
+              f" {sum(latencias) / len(latencias) * 1000:>10.3f}ms {max(latencias) * 1000:>9.3f}ms"
+              f" {t_sugerir * 1000:>8.3f}ms {t_borrar * 1000:>8.4f}ms")
+
+
+BENCHMARKS = {
+    "viterbi": benchmark_viterbi,
+    "conteo": benchmark_conteo,
+    "paralelo": benchmark_paralelo,
+    "pipeline": benchmark_pipeline,
+    "incremental": benchmark_incremental,
+    "render": benchmark_render,
+    "disperso": benchmark_disperso,
+    "lexico": benchmark_lexico,
+    "autocompletado": benchmark_autocompletado,
+}
+
+if __name__ == "__main__":
+    nombres = sys.argv[1:] or list(BENCHMARKS)
+    for nombre in nombres:
+        print(f"\n== {nombre} ==")
+        BENCHMARKS[nombre]()
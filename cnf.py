@@ -87,6 +87,7 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
     g.T  = set(gramatica.T)
     g.S  = gramatica.S
     g.P  = {A: set(prods) for A, prods in gramatica.P.items()}
+    g.pesos = dict(gramatica.pesos)
 
     # 1) Introducir nuevo inicio S0 -> S (estándar)
     s0 = _nueva_variable(g, base="S0")
@@ -95,11 +96,14 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
     if g.S in g.P:
         for produccion in g.P[g.S]:
             g.P.setdefault(s0, set()).add(produccion)
+            if (g.S, produccion) in g.pesos:
+                g.pesos[(s0, produccion)] = g.pesos[(g.S, produccion)]
     g.S = s0
 
     # 2) Sustituir terminales dentro de producciones de longitud >= 2 por variables T_x
     mapa_terminales: Dict[Symbol, Symbol] = {}
     producciones_transformadas: Dict[Symbol, Set[Production]] = {}
+    pesos_transformados: Dict[Tuple[Symbol, Production], float] = {}
 
     for A, producciones in list(g.P.items()):
         producciones_transformadas[A] = set()
@@ -123,11 +127,26 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
                     v = _variable_para_terminal(g, simbolo, mapa_terminales)
                     nueva.append(v)
             producciones_transformadas[A].add(tuple(nueva))
+            if g.pesos:
+                clave = (A, tuple(nueva))
+                pesos_transformados[clave] = max(pesos_transformados.get(clave, 0.0), g.peso(A, produccion))
+
+    # Las reglas que no cambiaron conservan su peso; las T_x -> x valen 1.0
+    for A, producciones in producciones_transformadas.items():
+        for produccion in producciones:
+            if (A, produccion) in g.pesos and (A, produccion) not in pesos_transformados:
+                pesos_transformados[(A, produccion)] = g.pesos[(A, produccion)]
+
+    # Las reglas T_x -> x se crearon sobre g.P; hay que conservarlas
+    for t, var in mapa_terminales.items():
+        producciones_transformadas.setdefault(var, set()).add((t,))
 
     g.P = producciones_transformadas
+    g.pesos = pesos_transformados
 
     # 3) Binarizar (A -> X1 X2 ... Xn con n>=3)
     finales: Dict[Symbol, Set[Production]] = {}
+    pesos_finales: Dict[Tuple[Symbol, Production], float] = {}
 
     for A, producciones in g.P.items():
         finales[A] = set()
@@ -136,6 +155,8 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
             if n <= 2:
                 # Ya es CNF (A -> a o A -> B C)
                 finales[A].add(produccion)
+                if (A, produccion) in g.pesos:
+                    pesos_finales[(A, produccion)] = g.pesos[(A, produccion)]
                 continue
 
             # Binarización encadenada para n >= 3
@@ -148,6 +169,9 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
                 finales.setdefault(Z, set())
                 # izquierda_actual -> simbolos[0] Z
                 finales[izquierda_actual].add((simbolos[0], Z))
+                # El peso queda en la primera regla; las auxiliares valen 1.0
+                if izquierda_actual == A and (A, produccion) in g.pesos:
+                    pesos_finales[(A, (simbolos[0], Z))] = g.pesos[(A, produccion)]
                 # Z recibirá el resto más adelante
                 izquierda_actual = Z
                 simbolos = simbolos[1:]
@@ -157,6 +181,7 @@ def convertir_a_cnf(gramatica: Gramatica) -> Gramatica:
 
     # Reemplazar P por las finales (ya binarias o unitarias válidas A->a)
     g.P = finales
+    g.pesos = pesos_finales
 
     # 4) Asegurar que todas las claves de P existan
     for A in g.NT:
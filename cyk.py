@@ -1,16 +1,22 @@
 # cyk.py
 # Implementación del algoritmo CYK (Cocke-Younger-Kasami)
 
-from typing import Dict, Set, List, Tuple, Optional
+from typing import Dict, Set, List, Tuple, Optional, TextIO
 from gramatica import Gramatica, Symbol, Production
+from tokenizador import Tokenizador, IndiceLexico, indice_para, tokenizar
+import heapq
+import io
+import math
 import time
 
 class Derivacion:
     """Representa un nodo de derivación en el parse tree"""
-    def __init__(self, simbolo: Symbol, hijos: List['Derivacion'] = None, terminal: str = None):
+    def __init__(self, simbolo: Symbol, hijos: List['Derivacion'] = None, terminal: str = None,
+                 log_prob: float = 0.0):
         self.simbolo = simbolo
         self.hijos = hijos if hijos else []
         self.terminal = terminal  # Si es una hoja (terminal)
+        self.log_prob = log_prob  # Log-probabilidad del subárbol (modo Viterbi)
     
     def __repr__(self):
         if self.terminal:
@@ -23,6 +29,7 @@ class ResultadoCYK:
         self.acepta = acepta
         self.tiempo = tiempo
         self.tabla = tabla
+        self.desconocidos: List[Tuple[int, str]] = []  # (posición, token) sin regla A -> a
         self.parse_tree = None
         
         if acepta and tabla:
@@ -46,39 +53,50 @@ class ResultadoCYK:
     
     def imprimir_parse_tree(self, nodo: Derivacion = None, nivel: int = 0, prefijo: str = "") -> str:
         """Imprime el parse tree en formato legible"""
+        salida = io.StringIO()
+        self.escribir_parse_tree(nodo, salida, prefijo)
+        return salida.getvalue()
+
+    def escribir_parse_tree(self, nodo: Optional[Derivacion], salida: TextIO, prefijo: str = ""):
+        """
+        Escribe el parse tree en un stream en una sola pasada (iterativo, sin
+        recursión ni re-indentar el texto de los hijos). Con nodo=None se usa
+        parse_tree; como en exportar.py, el stream va después del árbol.
+        """
         if nodo is None:
             nodo = self.parse_tree
-        
+
         if nodo is None:
-            return "No hay parse tree disponible"
-        
-        resultado = []
-        
-        # Imprimir el nodo actual
-        if nodo.terminal:
-            resultado.append(f"{prefijo}{nodo.simbolo} → '{nodo.terminal}'")
-        else:
-            resultado.append(f"{prefijo}{nodo.simbolo}")
-        
-        # Imprimir los hijos
-        for i, hijo in enumerate(nodo.hijos):
-            es_ultimo = (i == len(nodo.hijos) - 1)
-            nuevo_prefijo = prefijo + ("    " if es_ultimo else "│   ")
-            conector = "└── " if es_ultimo else "├── "
-            
-            lineas_hijo = self.imprimir_parse_tree(hijo, nivel + 1, nuevo_prefijo)
-            primera_linea = lineas_hijo.split('\n')[0]
-            resultado.append(f"{prefijo}{conector}{primera_linea.strip()}")
-            
-            # Agregar el resto de las líneas con la indentación correcta
-            for linea in lineas_hijo.split('\n')[1:]:
-                if linea.strip():
-                    resultado.append(linea)
-        
-        return '\n'.join(resultado)
+            salida.write("No hay parse tree disponible")
+            return
+
+        # Pila de (nodo, inicio de su línea, prefijo para sus hijos)
+        pila: List[Tuple[Derivacion, str, str]] = [(nodo, prefijo, prefijo)]
+        primera = True
+        while pila:
+            actual, inicio_linea, prefijo_hijos = pila.pop()
+            if not primera:
+                salida.write("\n")
+            primera = False
+
+            salida.write(inicio_linea)
+            if actual.terminal:
+                salida.write(f"{actual.simbolo} → '{actual.terminal}'")
+            else:
+                salida.write(actual.simbolo)
+
+            # Los hijos se apilan al revés para escribirlos en orden
+            ultimo = len(actual.hijos) - 1
+            for i in range(ultimo, -1, -1):
+                es_ultimo = (i == ultimo)
+                conector = "└── " if es_ultimo else "├── "
+                nuevo_prefijo = prefijo_hijos + ("    " if es_ultimo else "│   ")
+                pila.append((actual.hijos[i], prefijo_hijos + conector, nuevo_prefijo))
 
 
-def cyk(gramatica: Gramatica, cadena: str) -> ResultadoCYK:
+def cyk(gramatica: Gramatica, cadena: str,
+        tokenizador: Optional[Tokenizador] = None,
+        indice: Optional[IndiceLexico] = None) -> ResultadoCYK:
     """
     Algoritmo CYK para determinar si una cadena pertenece al lenguaje
     generado por una gramática en CNF.
@@ -86,20 +104,33 @@ def cyk(gramatica: Gramatica, cadena: str) -> ResultadoCYK:
     Args:
         gramatica: Gramática en Forma Normal de Chomsky
         cadena: Cadena a validar (palabras separadas por espacios)
+        tokenizador: Tokenizador a usar (por defecto espacios y minúsculas)
+        indice: Índice precompilado de la gramática (ver IndiceLexico); si no
+                se da, se construye en cada llamada
     
     Returns:
         ResultadoCYK con el resultado del parsing
     """
     inicio_tiempo = time.time()
     
-    # Tokenizar la cadena (CONVERTIR a minúsculas)
-    palabras = cadena.strip().lower().split()
+    # Tokenizar la cadena (por defecto, en minúsculas)
+    palabras = tokenizar(cadena, tokenizador)
     n = len(palabras)
     
     if n == 0:
         tiempo_transcurrido = time.time() - inicio_tiempo
         return ResultadoCYK(False, tiempo_transcurrido)
     
+    if indice is None:
+        indice = indice_para(gramatica, tokenizador)
+    
+    # Un token sin regla A -> a hace imposible aceptar: no hace falta llenar la tabla
+    desconocidos = indice.desconocidos(palabras)
+    if desconocidos:
+        resultado = ResultadoCYK(False, time.time() - inicio_tiempo)
+        resultado.desconocidos = desconocidos
+        return resultado
+    
     # Crear tabla CYK: tabla[i][j] contiene los no terminales que derivan w[j]...w[j+i]
     # Para cada no terminal, guardamos una lista de posibles derivaciones
     tabla: List[List[Dict[Symbol, List[Derivacion]]]] = [
@@ -110,16 +141,13 @@ def cyk(gramatica: Gramatica, cadena: str) -> ResultadoCYK:
     for j in range(n):
         palabra = palabras[j]
         
-        # Buscar producciones A -> palabra (comparación exacta, case-sensitive)
-        for A, producciones in gramatica.P.items():
-            for produccion in producciones:
-                # Producción A -> a (terminal único)
-                if len(produccion) == 1 and produccion[0] == palabra:
-                    if A not in tabla[0][j]:
-                        tabla[0][j][A] = []
-                    # Crear nodo hoja
-                    derivacion = Derivacion(A, terminal=palabra)
-                    tabla[0][j][A].append(derivacion)
+        # Producciones A -> palabra, directamente desde el índice
+        for A in indice.buscar(palabra):
+            # Crear nodo hoja
+            tabla[0][j][A] = [Derivacion(A, terminal=palabra)]
+    
+    # Producciones A -> B C, en el mismo orden de P (sin recorrer el léxico en el paso 2)
+    binarias = indice.reglas_binarias
     
     # Paso 2: Llenar el resto de la tabla (subcadenas de longitud > 1)
     for i in range(1, n):  # longitud - 1
@@ -127,24 +155,20 @@ def cyk(gramatica: Gramatica, cadena: str) -> ResultadoCYK:
             # Para cada forma de partir la subcadena
             for k in range(i):  # punto de partición
                 # Mirar producciones A -> B C
-                for A, producciones in gramatica.P.items():
-                    for produccion in producciones:
-                        if len(produccion) == 2:
-                            B, C = produccion
-                            
-                            # Si B está en tabla[k][j] y C está en tabla[i-k-1][j+k+1]
-                            if B in tabla[k][j] and C in tabla[i-k-1][j+k+1]:
-                                if A not in tabla[i][j]:
-                                    tabla[i][j][A] = []
-                                
-                                # Crear derivaciones combinando todas las posibles
-                                for derivacion_B in tabla[k][j][B]:
-                                    for derivacion_C in tabla[i-k-1][j+k+1][C]:
-                                        nueva_derivacion = Derivacion(
-                                            A, 
-                                            hijos=[derivacion_B, derivacion_C]
-                                        )
-                                        tabla[i][j][A].append(nueva_derivacion)
+                for A, B, C in binarias:
+                    # Si B está en tabla[k][j] y C está en tabla[i-k-1][j+k+1]
+                    if B in tabla[k][j] and C in tabla[i-k-1][j+k+1]:
+                        if A not in tabla[i][j]:
+                            tabla[i][j][A] = []
+                        
+                        # Crear derivaciones combinando todas las posibles
+                        for derivacion_B in tabla[k][j][B]:
+                            for derivacion_C in tabla[i-k-1][j+k+1][C]:
+                                nueva_derivacion = Derivacion(
+                                    A, 
+                                    hijos=[derivacion_B, derivacion_C]
+                                )
+                                tabla[i][j][A].append(nueva_derivacion)
     
     # Verificar si el símbolo inicial está en la celda superior
     acepta = gramatica.S in tabla[n-1][0] and len(tabla[n-1][0][gramatica.S]) > 0
@@ -154,26 +178,213 @@ def cyk(gramatica: Gramatica, cadena: str) -> ResultadoCYK:
     return ResultadoCYK(acepta, tiempo_transcurrido, tabla if acepta else None)
 
 
-def imprimir_tabla_cyk(tabla: List[List[Dict[Symbol, List[Derivacion]]]], palabras: List[str]):
-    """Imprime la tabla CYK de forma legible"""
+def imprimir_tabla_cyk(tabla: List[List[Dict[Symbol, List[Derivacion]]]], palabras: List[str],
+                       salida: TextIO = None):
+    """Imprime la tabla CYK de forma legible (en salida, o en pantalla por defecto)"""
     n = len(palabras)
     
-    print("\nTabla CYK:")
-    print("=" * 80)
+    print("\nTabla CYK:", file=salida)
+    print("=" * 80, file=salida)
     
     # Caso especial: oración de 1 palabra
     if n == 1:
-        print(f"\nLongitud 1:")
+        print(f"\nLongitud 1:", file=salida)
         simbolos = list(tabla[0][0].keys())
         if simbolos:
-            print(f"  [0:1] '{palabras[0].lower()}': {{{', '.join(sorted(simbolos))}}}")
+            print(f"  [0:1] '{palabras[0].lower()}': {{{', '.join(sorted(simbolos))}}}", file=salida)
         return
     
     for i in range(n-1, -1, -1):
-        print(f"\nLongitud {i+1}:")
+        print(f"\nLongitud {i+1}:", file=salida)
         for j in range(n - i):
             simbolos = list(tabla[i][j].keys())
             if simbolos:
                 rango = f"[{j}:{j+i+1}]"
                 subcadena = " ".join(palabras[j:j+i+1])
-                print(f"  {rango} '{subcadena.lower()}': {{{', '.join(sorted(simbolos))}}}")
\ No newline at end of file
+                print(f"  {rango} '{subcadena.lower()}': {{{', '.join(sorted(simbolos))}}}", file=salida)
+
+
+def _podar_celda(celda: Dict[Symbol, List[Derivacion]],
+                 beam: Optional[int],
+                 umbral: Optional[float]) -> Dict[Symbol, List[Derivacion]]:
+    """Aplica el umbral relativo y el ancho de beam a una celda Viterbi"""
+    if not celda:
+        return celda
+    if umbral is not None:
+        # Se descartan los no terminales con prob < umbral * mejor prob de la celda
+        mejor = max(derivaciones[0].log_prob for derivaciones in celda.values())
+        limite = mejor + math.log(umbral)
+        celda = {A: d for A, d in celda.items() if d[0].log_prob >= limite}
+    if beam is not None and len(celda) > beam:
+        mejores = heapq.nlargest(beam, celda.items(), key=lambda item: item[1][0].log_prob)
+        celda = dict(mejores)
+    return celda
+
+
+def cyk_viterbi(gramatica: Gramatica, cadena: str,
+                beam: Optional[int] = None,
+                umbral: Optional[float] = None,
+                tokenizador: Optional[Tokenizador] = None,
+                indice: Optional[IndiceLexico] = None) -> ResultadoCYK:
+    """
+    CYK probabilístico (Viterbi): en cada celda guarda solo la mejor
+    derivación de cada no terminal según los pesos de la gramática.
+
+    Args:
+        gramatica: Gramática en CNF (con pesos opcionales, 1.0 por defecto)
+        cadena: Cadena a validar (palabras separadas por espacios)
+        beam: Máximo de no terminales que se conservan por celda (None = sin límite)
+        umbral: Se descartan los no terminales cuya probabilidad sea menor que
+                umbral * (mejor probabilidad de la celda), 0 < umbral <= 1
+        tokenizador: Tokenizador a usar (por defecto espacios y minúsculas)
+        indice: Índice precompilado de la gramática (ver IndiceLexico)
+
+    Returns:
+        ResultadoCYK; la tabla tiene una sola derivación por no terminal
+        y la probabilidad del mejor árbol queda en parse_tree.log_prob
+    """
+    if beam is not None and beam < 1:
+        raise ValueError("El ancho de beam debe ser al menos 1.")
+    if umbral is not None and not (0 < umbral <= 1):
+        raise ValueError("El umbral debe estar en el intervalo (0, 1].")
+
+    inicio_tiempo = time.time()
+
+    palabras = tokenizar(cadena, tokenizador)
+    n = len(palabras)
+
+    if n == 0:
+        tiempo_transcurrido = time.time() - inicio_tiempo
+        return ResultadoCYK(False, tiempo_transcurrido)
+
+    if indice is None:
+        indice = indice_para(gramatica, tokenizador)
+    lexicas, binarias = indice.lexicas, indice.binarias
+
+    tabla: List[List[Dict[Symbol, List[Derivacion]]]] = [
+        [{} for _ in range(n)] for _ in range(n)
+    ]
+
+    # Paso 1: reglas A -> palabra
+    for j in range(n):
+        palabra = palabras[j]
+        celda: Dict[Symbol, List[Derivacion]] = {}
+        for A, log_p in lexicas.get(palabra, ()):
+            if A not in celda or log_p > celda[A][0].log_prob:
+                celda[A] = [Derivacion(A, terminal=palabra, log_prob=log_p)]
+        tabla[0][j] = celda if n == 1 else _podar_celda(celda, beam, umbral)
+
+    # Paso 2: reglas A -> B C, guardando solo el mejor back-pointer por A
+    for i in range(1, n):
+        for j in range(n - i):
+            celda = {}
+            for k in range(i):
+                izquierda = tabla[k][j]
+                derecha = tabla[i-k-1][j+k+1]
+                if not izquierda or not derecha:
+                    continue
+                for B, derivaciones_B in izquierda.items():
+                    derivacion_B = derivaciones_B[0]
+                    for A, C, log_p in binarias.get(B, ()):
+                        if C not in derecha:
+                            continue
+                        derivacion_C = derecha[C][0]
+                        puntaje = log_p + derivacion_B.log_prob + derivacion_C.log_prob
+                        if A not in celda or puntaje > celda[A][0].log_prob:
+                            celda[A] = [Derivacion(A, hijos=[derivacion_B, derivacion_C],
+                                                   log_prob=puntaje)]
+            # La celda superior no se poda: ahí no ahorra trabajo y podría descartar a S
+            tabla[i][j] = celda if i == n - 1 else _podar_celda(celda, beam, umbral)
+
+    acepta = gramatica.S in tabla[n-1][0]
+
+    tiempo_transcurrido = time.time() - inicio_tiempo
+
+    resultado = ResultadoCYK(acepta, tiempo_transcurrido, tabla if acepta else None)
+    if acepta:
+        # La celda superior puede tener otros no terminales; el árbol es el de S
+        resultado.parse_tree = tabla[n-1][0][gramatica.S][0]
+    return resultado
+
+
+class ResultadoConteo:
+    """Resultado del modo de conteo: número de árboles sin construirlos"""
+    def __init__(self, acepta: bool, tiempo: float, total: int,
+                 conteos: List[List[Dict[Symbol, int]]] = None, palabras: List[str] = None):
+        self.acepta = acepta
+        self.tiempo = tiempo
+        self.total = total        # Árboles distintos para el símbolo inicial
+        self.conteos = conteos    # conteos[i][j][A] = árboles de A sobre w[j]...w[j+i]
+        self.palabras = palabras
+
+    def puntos_calientes(self, k: int = 5) -> List[Tuple[int, int, Symbol, int]]:
+        """
+        Devuelve los k pares (span, no terminal) más ambiguos como
+        (inicio, fin, no terminal, número de árboles), de mayor a menor.
+        Solo se consideran los que tienen más de un árbol.
+        """
+        if not self.conteos:
+            return []
+        candidatos = (
+            (j, j + i + 1, A, cantidad)
+            for i, fila in enumerate(self.conteos)
+            for j, celda in enumerate(fila)
+            for A, cantidad in celda.items()
+            if cantidad > 1
+        )
+        return heapq.nlargest(k, candidatos, key=lambda item: item[3])
+
+
+def contar_arboles(gramatica: Gramatica, cadena: str,
+                   tokenizador: Optional[Tokenizador] = None,
+                   indice: Optional[IndiceLexico] = None) -> ResultadoConteo:
+    """
+    Cuenta los árboles de derivación distintos de la cadena con la misma
+    programación dinámica O(n³·|G|) de CYK, usando enteros de precisión
+    arbitraria en lugar de materializar cada Derivacion.
+
+    El tokenizador y el índice son los mismos que acepta cyk().
+    """
+    inicio_tiempo = time.time()
+
+    palabras = tokenizar(cadena, tokenizador)
+    n = len(palabras)
+
+    if n == 0:
+        tiempo_transcurrido = time.time() - inicio_tiempo
+        return ResultadoConteo(False, tiempo_transcurrido, 0)
+
+    if indice is None:
+        indice = indice_para(gramatica, tokenizador)
+    lexicas, binarias = indice.lexicas, indice.binarias
+
+    conteos: List[List[Dict[Symbol, int]]] = [
+        [{} for _ in range(n - i)] for i in range(n)
+    ]
+
+    # Paso 1: cada regla A -> palabra aporta un árbol
+    for j in range(n):
+        celda = conteos[0][j]
+        for A, _ in lexicas.get(palabras[j], ()):
+            celda[A] = celda.get(A, 0) + 1
+
+    # Paso 2: árboles(A, span) = Σ reglas A -> B C, Σ particiones árboles(B) · árboles(C)
+    for i in range(1, n):
+        for j in range(n - i):
+            celda = conteos[i][j]
+            for k in range(i):
+                izquierda = conteos[k][j]
+                derecha = conteos[i-k-1][j+k+1]
+                if not izquierda or not derecha:
+                    continue
+                for B, cantidad_B in izquierda.items():
+                    for A, C, _ in binarias.get(B, ()):
+                        cantidad_C = derecha.get(C)
+                        if cantidad_C:
+                            celda[A] = celda.get(A, 0) + cantidad_B * cantidad_C
+
+    total = conteos[n-1][0].get(gramatica.S, 0)
+
+    tiempo_transcurrido = time.time() - inicio_tiempo
+
+    return ResultadoConteo(total > 0, tiempo_transcurrido, total, conteos, palabras)
@@ -0,0 +1,115 @@
+# cykDisperso.py
+# CYK disperso dirigido por agenda.
+# Solo se guardan los spans no vacíos, indexados por posición de inicio y de fin,
+# y cada span se combina únicamente con vecinos no vacíos. El costo depende de
+# cuántas celdas se llenan, no de n³.
+
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from gramatica import Gramatica, Symbol
+from cyk import Derivacion, ResultadoCYK
+from tokenizador import Tokenizador, IndiceLexico, indice_para, tokenizar
+
+Celda = Dict[Symbol, List[Derivacion]]
+# reglas[B] = [(posición en P, A, C), ...] para A -> B C
+Reglas = Dict[Symbol, List[Tuple[int, Symbol, Symbol]]]
+
+
+def _combinar(celda: Celda, izquierda: Celda, derecha: Celda, reglas: Reglas):
+    """
+    Agrega a celda las derivaciones A -> B C con B en izquierda y C en derecha,
+    en el orden de P (el mismo en que cyk() recorre las reglas)
+    """
+    aplicables = sorted((posicion, A, B, C)
+                        for B in izquierda
+                        for posicion, A, C in reglas.get(B, ())
+                        if C in derecha)
+    for _, A, B, C in aplicables:
+        destino = celda.setdefault(A, [])
+        for derivacion_B in izquierda[B]:
+            for derivacion_C in derecha[C]:
+                destino.append(Derivacion(A, hijos=[derivacion_B, derivacion_C]))
+
+
+def cyk_disperso(gramatica: Gramatica, cadena: str,
+                 tokenizador: Optional[Tokenizador] = None,
+                 indice: Optional[IndiceLexico] = None) -> ResultadoCYK:
+    """
+    Igual que cyk() (mismas derivaciones y en el mismo orden, así que también
+    el mismo parse_tree), pero recorriendo solo pares de spans vecinos no vacíos.
+
+    Los spans se procesan por longitud creciente. Cuando un span queda no
+    vacío se proponen como candidatos los spans que forma con sus vecinos ya
+    completos; un candidato se llena cuando le toca en la agenda (todos sus
+    sub-spans ya están completos), recorriendo sus particiones no vacías de
+    izquierda a derecha como cyk().
+
+    El tokenizador y el índice son los mismos que acepta cyk().
+    """
+    inicio_tiempo = time.time()
+
+    palabras = tokenizar(cadena, tokenizador)
+    n = len(palabras)
+
+    if n == 0:
+        tiempo_transcurrido = time.time() - inicio_tiempo
+        return ResultadoCYK(False, tiempo_transcurrido)
+
+    if indice is None:
+        indice = indice_para(gramatica, tokenizador)
+    reglas: Reglas = {}
+    for posicion, (A, B, C) in enumerate(indice.reglas_binarias):
+        reglas.setdefault(B, []).append((posicion, A, C))
+
+    # celdas[(i, j)] = no terminales que derivan w[i:j] (solo spans no vacíos)
+    celdas: Dict[Tuple[int, int], Celda] = {}
+    # Spans ya completos: fines por cada inicio e inicios por cada fin
+    por_inicio: List[List[int]] = [[] for _ in range(n + 1)]
+    por_fin: List[List[int]] = [[] for _ in range(n + 1)]
+    # agenda[l] = spans candidatos de longitud l (con algún par de vecinos no vacíos)
+    agenda: List[List[Tuple[int, int]]] = [[] for _ in range(n + 1)]
+    propuestos: Set[Tuple[int, int]] = set()
+
+    # Paso 1: reglas A -> palabra
+    for j, palabra in enumerate(palabras):
+        for A, _ in indice.lexicas.get(palabra, ()):
+            celdas.setdefault((j, j + 1), {})[A] = [Derivacion(A, terminal=palabra)]
+        if (j, j + 1) in celdas:
+            agenda[1].append((j, j + 1))
+
+    # Paso 2: completar spans en orden de longitud
+    for longitud in range(1, n + 1):
+        for i, j in agenda[longitud]:
+            if longitud > 1:
+                celda: Celda = {}
+                for k in sorted(k for k in por_inicio[i] if (k, j) in celdas):
+                    _combinar(celda, celdas[(i, k)], celdas[(k, j)], reglas)
+                if not celda:
+                    continue
+                celdas[(i, j)] = celda
+
+            # Candidatos: como span derecho de (h, i) y como izquierdo de (j, k)
+            for padre in [(h, j) for h in por_fin[i]] + [(i, k) for k in por_inicio[j]]:
+                if padre not in propuestos:
+                    propuestos.add(padre)
+                    agenda[padre[1] - padre[0]].append(padre)
+
+            por_inicio[i].append(j)
+            por_fin[j].append(i)
+
+    superior = celdas.get((0, n), {})
+    acepta = bool(superior.get(gramatica.S))
+
+    tabla = None
+    if acepta:
+        # Tabla densa solo para mostrar el resultado; las celdas vacías
+        # comparten el mismo diccionario (de solo lectura)
+        vacia: Celda = {}
+        tabla = [[vacia] * (n - i) for i in range(n)]
+        for (i, j), celda in celdas.items():
+            tabla[j - i - 1][i] = celda
+
+    tiempo_transcurrido = time.time() - inicio_tiempo
+
+    return ResultadoCYK(acepta, tiempo_transcurrido, tabla)
@@ -0,0 +1,238 @@
+# cykParalelo.py
+# CYK por frentes de onda (wavefront) en varios núcleos.
+# Las celdas de una misma diagonal (spans de igual longitud) son independientes,
+# así que se reparten entre un pool de procesos; entre diagonales hay una barrera.
+# La tabla vive en memoria compartida como bitsets de no terminales.
+
+import os
+import time
+from multiprocessing import Pool, shared_memory
+from typing import Dict, List, Tuple, Optional
+
+from gramatica import Gramatica, Symbol
+from cyk import ResultadoCYK
+from tokenizador import Tokenizador, IndiceLexico, indice_para, tokenizar
+
+# Longitud mínima para usar el pool. None = nunca: todavía no se midió una
+# longitud en la que el pool gane al motor serial (ver benchmarks.py paralelo),
+# así que quien quiera el pool debe fijar el umbral medido en su máquina.
+UMBRAL_SERIAL: Optional[int] = None
+
+
+class GramaticaCompilada:
+    """
+    Gramática CNF traducida a bitsets: cada no terminal es un bit.
+
+    Las reglas se toman del IndiceLexico (el mismo que usan los demás motores),
+    así que las claves de lexicas tienen su plegado de mayúsculas; si no se da
+    índice se construye uno en minúsculas, como el tokenizador por defecto.
+    """
+    def __init__(self, gramatica: Gramatica, indice_lexico: Optional[IndiceLexico] = None):
+        if indice_lexico is None:
+            indice_lexico = IndiceLexico(gramatica)
+        self.simbolos: List[Symbol] = sorted(gramatica.NT)
+        indice = {A: b for b, A in enumerate(self.simbolos)}
+        self.bit_inicial = indice.get(gramatica.S)
+        self.ancho = max(1, (len(self.simbolos) + 7) // 8)  # bytes por celda
+
+        # lexicas[a] = máscara de los A con A -> a
+        self.lexicas: Dict[str, int] = {}
+        for terminal, no_terminales in indice_lexico.no_terminales.items():
+            mascara = 0
+            for A in no_terminales:
+                mascara |= 1 << indice[A]
+            self.lexicas[terminal] = mascara
+        # binarias[b] = [(c, máscara de los A con A -> B C), ...]
+        binarias: Dict[int, Dict[int, int]] = {}
+        for B, reglas in indice_lexico.binarias.items():
+            por_c = binarias.setdefault(indice[B], {})
+            for A, C, _ in reglas:
+                c = indice[C]
+                por_c[c] = por_c.get(c, 0) | (1 << indice[A])
+        self.binarias: List[List[Tuple[int, int]]] = [
+            list(binarias.get(b, {}).items()) for b in range(len(self.simbolos))
+        ]
+
+
+def _combinar(compilada: GramaticaCompilada, izquierda: int, derecha: int) -> int:
+    """Máscara de los A con A -> B C, B en izquierda y C en derecha"""
+    resultado = 0
+    while izquierda:
+        bajo = izquierda & -izquierda
+        for c, mascara in compilada.binarias[bajo.bit_length() - 1]:
+            if (derecha >> c) & 1:
+                resultado |= mascara
+        izquierda ^= bajo
+    return resultado
+
+
+class _Tabla:
+    """Vista de la tabla CYK sobre un buffer: celda (i, j) = span w[j]...w[j+i]"""
+    def __init__(self, buffer, n: int, ancho: int):
+        self.buffer = buffer
+        self.n = n
+        self.ancho = ancho
+
+    def leer(self, i: int, j: int) -> int:
+        inicio = (i * self.n + j) * self.ancho
+        return int.from_bytes(self.buffer[inicio:inicio + self.ancho], "little")
+
+    def escribir(self, i: int, j: int, valor: int):
+        inicio = (i * self.n + j) * self.ancho
+        self.buffer[inicio:inicio + self.ancho] = valor.to_bytes(self.ancho, "little")
+
+
+def _llenar_celdas(compilada: GramaticaCompilada, tabla: _Tabla, i: int, desde: int, hasta: int):
+    """Llena las celdas de la diagonal i con posición inicial en [desde, hasta)"""
+    for j in range(desde, hasta):
+        celda = 0
+        for k in range(i):
+            izquierda = tabla.leer(k, j)
+            if not izquierda:
+                continue
+            derecha = tabla.leer(i - k - 1, j + k + 1)
+            if derecha:
+                celda |= _combinar(compilada, izquierda, derecha)
+        if celda:
+            tabla.escribir(i, j, celda)
+
+
+# ---------------------------------------------------
+# Estado de cada proceso del pool
+# ---------------------------------------------------
+
+_compilada_worker: Optional[GramaticaCompilada] = None
+_memorias_worker: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _inicializar_worker(compilada: GramaticaCompilada):
+    global _compilada_worker
+    _compilada_worker = compilada
+
+
+def _tarea_worker(args: Tuple[str, int, int, int, int]):
+    nombre, n, i, desde, hasta = args
+    memoria = _memorias_worker.get(nombre)
+    if memoria is None:
+        # Se abre una sola vez por tabla; el proceso principal es el dueño del segmento
+        for anterior in _memorias_worker.values():
+            anterior.close()
+        _memorias_worker.clear()
+        memoria = shared_memory.SharedMemory(name=nombre)
+        _memorias_worker[nombre] = memoria
+    tabla = _Tabla(memoria.buf, n, _compilada_worker.ancho)
+    _llenar_celdas(_compilada_worker, tabla, i, desde, hasta)
+
+
+class CYKParalelo:
+    """
+    Motor CYK paralelo reutilizable: compila la gramática una vez y mantiene
+    el pool de procesos vivo entre oraciones. Solo reconoce (no construye árboles).
+
+    Uso:
+        with CYKParalelo(gramatica_cnf, procesos=4) as motor:
+            resultado = motor.cyk("she eats a cake ...")
+
+    Con umbral_serial=None (por defecto) siempre se usa el motor serial; con
+    un entero, las oraciones de al menos esa longitud van al pool.
+
+    El tokenizador y el índice son los mismos que acepta cyk().
+    """
+    def __init__(self, gramatica: Gramatica, procesos: Optional[int] = None,
+                 umbral_serial: Optional[int] = UMBRAL_SERIAL,
+                 tokenizador: Optional[Tokenizador] = None,
+                 indice: Optional[IndiceLexico] = None):
+        if indice is None:
+            indice = indice_para(gramatica, tokenizador)
+        self.tokenizador = tokenizador
+        self.indice = indice
+        self.compilada = GramaticaCompilada(gramatica, indice)
+        self.procesos = procesos or os.cpu_count() or 1
+        self.umbral_serial = umbral_serial
+        self._pool: Optional[Pool] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _obtener_pool(self) -> Pool:
+        if self._pool is None:
+            self._pool = Pool(self.procesos, initializer=_inicializar_worker,
+                              initargs=(self.compilada,))
+        return self._pool
+
+    def cyk(self, cadena: str) -> ResultadoCYK:
+        inicio_tiempo = time.time()
+
+        palabras = tokenizar(cadena, self.tokenizador)
+        n = len(palabras)
+        compilada = self.compilada
+
+        if n == 0 or compilada.bit_inicial is None:
+            return ResultadoCYK(False, time.time() - inicio_tiempo)
+
+        # Igual que cyk(): un token sin regla A -> a no puede aceptarse
+        desconocidos = self.indice.desconocidos(palabras)
+        if desconocidos:
+            resultado = ResultadoCYK(False, time.time() - inicio_tiempo)
+            resultado.desconocidos = desconocidos
+            return resultado
+
+        usar_pool = (self.procesos > 1 and self.umbral_serial is not None
+                     and n >= self.umbral_serial)
+        memoria = None
+        if usar_pool:
+            memoria = shared_memory.SharedMemory(create=True, size=n * n * compilada.ancho)
+            buffer = memoria.buf
+            buffer[:] = bytes(len(buffer))
+        else:
+            buffer = bytearray(n * n * compilada.ancho)
+
+        tabla = _Tabla(buffer, n, compilada.ancho)
+        try:
+            # Paso 1: primera fila
+            for j, palabra in enumerate(palabras):
+                mascara = compilada.lexicas.get(palabra, 0)
+                if mascara:
+                    tabla.escribir(0, j, mascara)
+
+            # Paso 2: una diagonal a la vez
+            for i in range(1, n):
+                celdas = n - i
+                if not usar_pool:
+                    _llenar_celdas(compilada, tabla, i, 0, celdas)
+                    continue
+                # Bloques contiguos, varios por proceso para balancear la carga
+                bloques = min(celdas, self.procesos * 4)
+                tam = (celdas + bloques - 1) // bloques
+                tareas = [(memoria.name, n, i, desde, min(desde + tam, celdas))
+                          for desde in range(0, celdas, tam)]
+                # map() bloquea hasta que termina toda la diagonal (barrera)
+                self._obtener_pool().map(_tarea_worker, tareas)
+
+            acepta = bool((tabla.leer(n - 1, 0) >> compilada.bit_inicial) & 1)
+        finally:
+            if memoria is not None:
+                # Soltar las vistas del buffer antes de cerrar el segmento
+                buffer = tabla = None
+                memoria.close()
+                memoria.unlink()
+
+        return ResultadoCYK(acepta, time.time() - inicio_tiempo)
+
+
+def cyk_paralelo(gramatica: Gramatica, cadena: str, procesos: Optional[int] = None,
+                 umbral_serial: Optional[int] = UMBRAL_SERIAL,
+                 tokenizador: Optional[Tokenizador] = None,
+                 indice: Optional[IndiceLexico] = None) -> ResultadoCYK:
+    """Atajo para una sola oración (crea y cierra el pool)"""
+    with CYKParalelo(gramatica, procesos, umbral_serial, tokenizador, indice) as motor:
+        return motor.cyk(cadena)
@@ -1,6 +1,6 @@
 # Eliminación de producciones epsilon
 
-from typing import Set, Dict, List
+from typing import Set, Dict, List, Tuple
 from itertools import combinations
 from gramatica import Gramatica, Symbol, Production
 
@@ -38,6 +38,30 @@ def encontrar_anulables(gramatica: Gramatica) -> Set[Symbol]:
     return anulables
 
 
+def pesos_anulables(gramatica: Gramatica) -> Dict[Symbol, float]:
+    """
+    Para cada no terminal anulable A devuelve el mayor producto de pesos de
+    una derivación A =>* ε.
+    """
+    mejores: Dict[Symbol, float] = {}
+
+    # Relajación acotada por |NT| + 1 rondas, como en pesos_pares_unitarios
+    for _ in range(len(gramatica.NT) + 1):
+        cambio = False
+        for A, producciones in gramatica.P.items():
+            for produccion in producciones:
+                if not all(simbolo in mejores for simbolo in produccion):
+                    continue
+                candidato = gramatica.peso(A, produccion)
+                for simbolo in produccion:
+                    candidato *= mejores[simbolo]
+                if candidato > mejores.get(A, 0.0):
+                    mejores[A] = candidato
+                    cambio = True
+        if not cambio:
+            break
+    return mejores
+
 
 # 2)eliminar producciones epsilon
 def eliminar_epsilon(gramatica: Gramatica) -> Gramatica:
@@ -48,6 +72,7 @@ def eliminar_epsilon(gramatica: Gramatica) -> Gramatica:
     nueva.T  = set(gramatica.T)
     nueva.S  = gramatica.S
     nueva.P  = {A: set(prods) for A, prods in gramatica.P.items()}
+    nueva.pesos = dict(gramatica.pesos)
 
     anulables = encontrar_anulables(nueva)
 
@@ -61,6 +86,8 @@ def eliminar_epsilon(gramatica: Gramatica) -> Gramatica:
 
     #Construir nuevas producciones sin epsion
     nuevoP: Dict[Symbol, Set[Production]] = {A: set() for A in nueva.P.keys()}
+    nuevos_pesos: Dict[Tuple[Symbol, Production], float] = {}
+    pesos_eps = pesos_anulables(nueva) if nueva.pesos else {}
 
     for A, producciones in nueva.P.items():
         for produccion in producciones:
@@ -73,8 +100,10 @@ def eliminar_epsilon(gramatica: Gramatica) -> Gramatica:
                 if (simbolo in nueva.NT and simbolo in anulables)
             ]
 
-            variantes: Set[Production] = set()
-            variantes.add(produccion)
+            # Cada variante con su peso: el de la regla original por el de
+            # derivar ε en los símbolos que se omiten
+            peso = nueva.peso(A, produccion)
+            variantes: Dict[Production, float] = {produccion: peso}
 
             for r in range(1, len(pos_anulables) + 1):
                 for combo in combinations(pos_anulables, r):
@@ -83,12 +112,23 @@ def eliminar_epsilon(gramatica: Gramatica) -> Gramatica:
                         s for i, s in enumerate(produccion) if i not in combo_set
                     )
                     if len(nueva_produccion) > 0:
-                        variantes.add(nueva_produccion)
+                        peso_variante = peso
+                        for i in combo:
+                            peso_variante *= pesos_eps.get(produccion[i], 1.0)
+                        variantes[nueva_produccion] = max(variantes.get(nueva_produccion, 0.0),
+                                                          peso_variante)
                     # Si queda vacía, no se agrega
 
-            nuevoP[A] |= variantes
+            nuevoP[A] |= set(variantes)
+
+            # Si varias reglas dan la misma variante se queda el mayor peso
+            if nueva.pesos:
+                for variante, peso_variante in variantes.items():
+                    clave = (A, variante)
+                    nuevos_pesos[clave] = max(nuevos_pesos.get(clave, 0.0), peso_variante)
 
     nueva.P = nuevoP
+    nueva.pesos = nuevos_pesos
     return nueva
 
 
@@ -51,6 +51,13 @@ def eliminar_no_productivos(gramatica: Gramatica) -> Gramatica:
         nuevoP[A] = filtradas
     gramatica_sin_productivos.P = nuevoP
 
+    # Conservar los pesos de las reglas que quedan
+    gramatica_sin_productivos.pesos = {}
+    for clave, peso in gramatica.pesos.items():
+        A, p = clave
+        if A in nuevoP and p in nuevoP[A]:
+            gramatica_sin_productivos.pesos[clave] = peso
+
     # Recalcular T
     gramatica_sin_productivos.T = set()
     for prods in gramatica_sin_productivos.P.values():
@@ -106,6 +113,13 @@ def eliminar_no_alcanzables(gramatica: Gramatica) -> Gramatica:
         nuevoP[A] = filtradas
     gramatica_sin_inalcanzables.P = nuevoP
 
+    # Conservar los pesos de las reglas que quedan
+    gramatica_sin_inalcanzables.pesos = {}
+    for clave, peso in gramatica.pesos.items():
+        A, p = clave
+        if A in nuevoP and p in nuevoP[A]:
+            gramatica_sin_inalcanzables.pesos[clave] = peso
+
     # Recalcular T
     gramatica_sin_inalcanzables.T = set()
     for prods in gramatica_sin_inalcanzables.P.values():
@@ -1,6 +1,6 @@
 #Eliminación de producciones unarias tipo A -> B
 
-from typing import Set, Tuple
+from typing import Set, Tuple, Dict
 from gramatica import Gramatica, Symbol, Production, es_no_terminal
 
 def es_produccion_unitaria(produccion: Production, gramatica: Gramatica) -> bool:
@@ -24,6 +24,28 @@ def encontrar_pares_unitarios(gramatica: Gramatica) -> Set[Tuple[Symbol, Symbol]
                         cambio = True
     return pares
 
+def pesos_pares_unitarios(gramatica: Gramatica) -> Dict[Tuple[Symbol, Symbol], float]:
+    """
+    Para cada par unitario (A, B) devuelve el mayor producto de pesos de una
+    cadena A -> ... -> B de producciones unarias ((A, A) vale 1.0).
+    """
+    mejores: Dict[Tuple[Symbol, Symbol], float] = {(A, A): 1.0 for A in gramatica.NT}
+
+    # Relajación al estilo Bellman-Ford, acotada por |NT| rondas
+    for _ in range(len(gramatica.NT)):
+        cambio = False
+        for (A, B), peso_AB in list(mejores.items()):
+            for produccion in gramatica.P.get(B, ()):
+                if es_produccion_unitaria(produccion, gramatica):
+                    C = produccion[0]
+                    candidato = peso_AB * gramatica.peso(B, produccion)
+                    if candidato > mejores.get((A, C), 0.0):
+                        mejores[(A, C)] = candidato
+                        cambio = True
+        if not cambio:
+            break
+    return mejores
+
 def eliminar_unarias(gramatica: Gramatica) -> Gramatica:
 
     #nueva gramática
@@ -34,11 +56,17 @@ def eliminar_unarias(gramatica: Gramatica) -> Gramatica:
     gramatica_sin_unarias.P  = {A: set() for A in gramatica.P.keys()}
 
     clausura = encontrar_pares_unitarios(gramatica)
+    pesos_pares = pesos_pares_unitarios(gramatica) if gramatica.pesos else {}
 
     for A, B in clausura:
         for produccion in gramatica.P.get(B, ()):
             if not es_produccion_unitaria(produccion, gramatica):
                 gramatica_sin_unarias.P.setdefault(A, set()).add(produccion)
+                if pesos_pares:
+                    # A -> α vía A =>* B -> α: se conserva la mejor cadena
+                    peso = pesos_pares.get((A, B), 1.0) * gramatica.peso(B, produccion)
+                    clave = (A, produccion)
+                    gramatica_sin_unarias.pesos[clave] = max(gramatica_sin_unarias.pesos.get(clave, 0.0), peso)
 
     for A in gramatica_sin_unarias.NT:
         gramatica_sin_unarias.P.setdefault(A, set())
@@ -0,0 +1,90 @@
+# exportar.py
+# Exportación compacta de parse trees (Derivacion) y de la tabla CYK.
+# Todo se escribe directamente en un stream (archivo, socket.makefile(), sys.stdout...)
+# en una sola pasada iterativa, sin construir el texto completo en memoria.
+
+import json
+from typing import Dict, List, TextIO, Union
+
+from gramatica import Symbol
+from cyk import Derivacion
+
+# Convención del Penn Treebank para paréntesis (también dentro de un token: f(x) -> f-LRB-x-RRB-)
+_ESCAPES_PENN = str.maketrans({"(": "-LRB-", ")": "-RRB-"})
+
+
+def _escapar_penn(texto: str) -> str:
+    return texto.translate(_ESCAPES_PENN)
+
+
+def escribir_penn(nodo: Derivacion, salida: TextIO):
+    """
+    Escribe el árbol en formato con corchetes estilo Penn:
+        (S (NP she) (VP (VP eats) (NP (Det a) (N cake))))
+    """
+    pila: List[Union[Derivacion, str]] = [nodo]
+    while pila:
+        actual = pila.pop()
+        if isinstance(actual, str):
+            salida.write(actual)
+            continue
+        if actual.terminal:
+            salida.write(f"({_escapar_penn(actual.simbolo)} {_escapar_penn(actual.terminal)})")
+            continue
+        salida.write(f"({_escapar_penn(actual.simbolo)}")
+        pila.append(")")
+        for hijo in reversed(actual.hijos):
+            pila.append(hijo)
+            pila.append(" ")
+
+
+def escribir_json(nodo: Derivacion, salida: TextIO):
+    """
+    Escribe el árbol como JSON:
+        {"simbolo": "S", "hijos": [{"simbolo": "NP", "terminal": "she"}, ...]}
+    """
+    pila: List[Union[Derivacion, str]] = [nodo]
+    while pila:
+        actual = pila.pop()
+        if isinstance(actual, str):
+            salida.write(actual)
+            continue
+        salida.write('{"simbolo": ')
+        salida.write(json.dumps(actual.simbolo, ensure_ascii=False))
+        if actual.terminal:
+            salida.write(', "terminal": ')
+            salida.write(json.dumps(actual.terminal, ensure_ascii=False))
+            salida.write("}")
+            continue
+        salida.write(', "hijos": [')
+        pila.append("]}")
+        for i in range(len(actual.hijos) - 1, -1, -1):
+            pila.append(actual.hijos[i])
+            if i > 0:
+                pila.append(", ")
+
+
+def escribir_tabla_json(tabla: List[List[Dict[Symbol, List[Derivacion]]]], palabras: List[str],
+                        salida: TextIO):
+    """
+    Escribe las celdas no vacías de la tabla CYK como JSON, una celda por línea:
+        {"palabras": [...], "celdas": [
+        {"inicio": 0, "fin": 1, "simbolos": ["NP"]},
+        ...]}
+    """
+    n = len(palabras)
+    salida.write('{"palabras": ')
+    salida.write(json.dumps(palabras, ensure_ascii=False))
+    salida.write(', "celdas": [')
+    primera = True
+    for i in range(n):
+        for j in range(n - i):
+            celda = tabla[i][j]
+            if not celda:
+                continue
+            salida.write("\n" if primera else ",\n")
+            primera = False
+            salida.write(f'{{"inicio": {j}, "fin": {j + i + 1}, "simbolos": ')
+            salida.write(json.dumps(sorted(celda), ensure_ascii=False))
+            salida.write("}")
+    salida.write("]}\n")
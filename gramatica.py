@@ -14,6 +14,8 @@ class Gramatica:
         self.T: Set[Symbol] = set()     # Terminales
         self.S: Symbol | None = None    # Símbolo inicial
         self.P: Dict[Symbol, Set[Production]] = {}  # Producciones
+        # Pesos (probabilidades) opcionales por regla; si no aparece vale 1.0
+        self.pesos: Dict[Tuple[Symbol, Production], float] = {}
 
     def agregar_no_terminal(self, simbolo: Symbol):
         if simbolo and simbolo[0].isupper(): #Asegurar que el No terminal inicie con mayúscula
@@ -33,7 +35,7 @@ class Gramatica:
         self.S = simbolo
         self.agregar_no_terminal(simbolo)  #Asegurar que el símbolo inicial sea un no terminal
 
-    def agregar_produccion(self, no_terminal: Symbol, produccion: Production):
+    def agregar_produccion(self, no_terminal: Symbol, produccion: Production, peso: float | None = None):
         if no_terminal not in self.NT:
             self.agregar_no_terminal(no_terminal)
 
@@ -43,6 +45,10 @@ class Gramatica:
             produccion = tuple(produccion)
 
         self.P.setdefault(no_terminal, set()).add(produccion)
+        if peso is not None:
+            if peso <= 0:
+                raise ValueError(f"El peso de {no_terminal} -> {' '.join(produccion)} debe ser positivo.")
+            self.pesos[(no_terminal, produccion)] = peso
         for simbolo in produccion:
             if simbolo == 'ε':
                 continue
@@ -50,6 +56,10 @@ class Gramatica:
                 self.agregar_no_terminal(simbolo)
             else:
                 self.agregar_terminal(simbolo)
+
+    def peso(self, no_terminal: Symbol, produccion: Production) -> float:
+        """Peso de la regla no_terminal -> produccion (1.0 si no se especificó)"""
+        return self.pesos.get((no_terminal, produccion), 1.0)
                 
     def format(self) -> str:
         nt_list = [x for x in self.NT if x is not None]
@@ -59,13 +69,20 @@ class Gramatica:
         gramatica_formateada.append(f"Símbolo inicial: {self.S}")
         gramatica_formateada.append("Producciones:")
         for A, producciones in self.P.items():
-            derivaciones = [" ".join(p) if p else "ε" for p in producciones]
+            derivaciones = []
+            for p in producciones:
+                texto = " ".join(p) if p else "ε"
+                if (A, p) in self.pesos:
+                    texto += f" [{self.pesos[(A, p)]:g}]"
+                derivaciones.append(texto)
             gramatica_formateada.append(f"  {A} -> {' | '.join(sorted(derivaciones))}")
         return "\n".join(gramatica_formateada)
 
     
 
 NT_REGEX = re.compile(r"[A-Z][A-Za-z0-9_]*")
+# Peso opcional al final de una alternativa: NP -> Det N [0.6]
+PESO_REGEX = re.compile(r"^(.*?)\s*\[\s*([0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)\s*\]$")
 
 def es_no_terminal(simbolo: Symbol) -> bool:
     return bool(NT_REGEX.fullmatch(simbolo))
@@ -78,6 +95,13 @@ def parsear_derivacion(derivacion: str) -> Production:
     tokens = derivacion.split()
     return tuple(tokens)
 
+def separar_peso(alternativa: str) -> Tuple[str, float | None]:
+    """Separa 'Det N [0.6]' en ('Det N', 0.6). Sin peso devuelve (alternativa, None)."""
+    coincidencia = PESO_REGEX.match(alternativa.strip())
+    if not coincidencia or not coincidencia.group(1):
+        return alternativa, None
+    return coincidencia.group(1), float(coincidencia.group(2))
+
 def parsear_reglas(lines: Iterable[str], inicio: Symbol) -> "Gramatica":
     gramatica = Gramatica()
     gramatica.definir_simbolo_inicial(inicio)
@@ -101,8 +125,9 @@ def parsear_reglas(lines: Iterable[str], inicio: Symbol) -> "Gramatica":
             alt = alt.strip()
             if not alt:
                 raise ValueError(f"Producción vacía en línea: {raw}")
+            alt, peso = separar_peso(alt)
             prod = parsear_derivacion(alt)
-            gramatica.agregar_produccion(left, prod)
+            gramatica.agregar_produccion(left, prod, peso)
 
     return gramatica
 
@@ -1,11 +1,10 @@
 # main.py
 # Módulo principal para llamar a las funciones de los otros módulos
 from gramatica import procesar_archivo
-from eliminarEpsilonProd import encontrar_anulables, eliminar_epsilon
-from eliminarUnariasProd import eliminar_unarias
-from eliminarSimbolosInutiles import eliminar_simbolos_inutiles
-from cnf import convertir_a_cnf
-from cyk import cyk, imprimir_tabla_cyk
+from eliminarEpsilonProd import encontrar_anulables
+from pipelineNormalizacion import PipelineNormalizacion
+from cyk import cyk, imprimir_tabla_cyk, contar_arboles
+from tokenizador import TokenizadorEspacios, IndiceLexico
 
 def main():
     archivo = "gramaticas/gramaticaProyecto.txt"
@@ -28,30 +27,35 @@ def main():
     anulables = encontrar_anulables(gramatica)
     print("\n[2] Símbolos anulables:", ", ".join(sorted(anulables)) if anulables else "∅")
 
+    # Las etapas modifican una sola gramática de trabajo (sin copias);
+    # cada etapa se imprime antes de pasar a la siguiente
+    pipeline = PipelineNormalizacion(gramatica)
+
     # Eliminar producciones epsilon
     print("\n[3] Eliminando producciones ε...")
-    gramatica_sin_epsilon = eliminar_epsilon(gramatica)
+    pipeline.eliminar_epsilon()
     print("\nGramática sin producciones ε:")
     print("-"*80)
-    print(gramatica_sin_epsilon.format())
+    print(pipeline.gramatica.format())
 
     # Eliminar producciones unarias
     print("\n[4] Eliminando producciones unarias...")
-    gramatica_sin_unitarias = eliminar_unarias(gramatica_sin_epsilon)
+    pipeline.eliminar_unarias()
     print("\nGramática sin unarias:")
     print("-"*80)
-    print(gramatica_sin_unitarias.format())
+    print(pipeline.gramatica.format())
 
     # Eliminar símbolos inútiles
     print("\n[5] Eliminando símbolos inútiles...")
-    gramatica_util = eliminar_simbolos_inutiles(gramatica_sin_unitarias)
+    pipeline.eliminar_simbolos_inutiles()
     print("\nGramática sin símbolos inútiles:")
     print("-"*80)
-    print(gramatica_util.format())
+    print(pipeline.gramatica.format())
 
     # Convertir a CNF
     print("\n[6] Convirtiendo a CNF...")
-    gramatica_cnf = convertir_a_cnf(gramatica_util)
+    pipeline.convertir_a_cnf()
+    gramatica_cnf = pipeline.gramatica
     print("\nGramática en CNF:")
     print("-"*80)
     print(gramatica_cnf.format())
@@ -66,6 +70,10 @@ def main():
 
     modo_debug = False
 
+    # Etapa léxica: se tokeniza igual que antes y el índice se compila una sola vez
+    tokenizador = TokenizadorEspacios()
+    indice = IndiceLexico(gramatica_cnf, minusculas=tokenizador.minusculas)
+
     while True:
         try:
             oracion = input("Oración > ").strip()
@@ -88,35 +96,37 @@ def main():
             print("-"*80)
             
             if modo_debug:
-                palabras = oracion.strip().lower().split()
+                palabras = tokenizador.tokenizar(oracion)
                 print(f"Tokens: {palabras}")
                 print(f"Número de tokens: {len(palabras)}")
                 print("\nBuscando producciones para cada token:")
                 for i, palabra in enumerate(palabras):
-                    encontradas = []
-                    for A, prods in gramatica_cnf.P.items():
-                        for prod in prods:
-                            if len(prod) == 1 and prod[0] == palabra:
-                                encontradas.append(A)
+                    encontradas = indice.buscar(palabra)
                     print(f"  '{palabra}' -> {encontradas if encontradas else 'NINGUNA'}")
                 print()
             
-            resultado = cyk(gramatica_cnf, oracion)
+            resultado = cyk(gramatica_cnf, oracion, tokenizador, indice)
             
             # Mostrar resultado
             if resultado.acepta:
                 print(f"✅ ACEPTADA (tiempo: {resultado.tiempo:.6f}s)")
+                conteo = contar_arboles(gramatica_cnf, oracion, tokenizador, indice)
+                print(f"Árboles de derivación distintos: {conteo.total}")
+                for inicio, fin, simbolo, cantidad in conteo.puntos_calientes(3):
+                    print(f"  [{inicio}:{fin}] {simbolo}: {cantidad} árboles")
                 print("\nÁrbol de derivación:")
                 print(resultado.imprimir_parse_tree())
                 
                 # Opcionalmente mostrar tabla CYK
                 respuesta = input("\n¿Desea ver la tabla CYK? (s/n): ").strip().lower()
                 if respuesta == 's':
-                    palabras = oracion.strip().split()
+                    palabras = tokenizador.tokenizar(oracion)
                     imprimir_tabla_cyk(resultado.tabla, palabras)
             else:
                 print(f"❌ RECHAZADA (tiempo: {resultado.tiempo:.6f}s)")
                 print("La oración no pertenece al lenguaje de la gramática.")
+                for posicion, token in resultado.desconocidos:
+                    print(f"  Token desconocido en la posición {posicion}: '{token}'")
             
             print("\n" + "="*80 + "\n")
             
@@ -0,0 +1,288 @@
+# pipelineNormalizacion.py
+# Normalización a CNF sobre una sola gramática de trabajo (sin clonar en cada etapa).
+# Ejecuta las mismas etapas que la cadena de main.py:
+#   eliminar_epsilon -> eliminar_unarias -> eliminar_simbolos_inutiles -> convertir_a_cnf
+# pero modificando la gramática en el lugar y manteniendo T al día de forma incremental.
+
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from gramatica import Gramatica, Symbol, Production, es_no_terminal
+from eliminarEpsilonProd import encontrar_anulables, pesos_anulables
+from eliminarUnariasProd import encontrar_pares_unitarios, pesos_pares_unitarios, es_produccion_unitaria
+from eliminarSimbolosInutiles import encontrar_no_terminales_productivos, encontrar_no_terminales_alcanzables
+from cnf import _sanear_nombre_terminal
+
+ETAPAS = ("epsilon", "unarias", "inutiles", "cnf")
+
+
+class PipelineNormalizacion:
+    """
+    Pipeline de normalización con una única gramática mutable.
+
+    La gramática recibida pasa a ser la de trabajo (se modifica en el lugar).
+    Para conservar una etapa intermedia se usa instantanea(), que comparte los
+    conjuntos de producciones con la gramática de trabajo y solo los copia
+    cuando una etapa posterior va a modificarlos (copy-on-write).
+    """
+    def __init__(self, gramatica: Gramatica):
+        self.gramatica = gramatica
+        # Índice: cuántas veces aparece cada terminal en las producciones (para T)
+        self._usos_terminal: Dict[Symbol, int] = {}
+        # ids de los conjuntos de producciones compartidos con alguna instantánea
+        self._compartidos: Set[int] = set()
+        # Próximo sufijo a probar por cada base de nombre nuevo (X, S0, T_plus, ...)
+        self._sufijos: Dict[str, int] = {}
+
+        for producciones in gramatica.P.values():
+            for produccion in producciones:
+                self._contar_terminales(produccion, 1)
+        gramatica.T = set(self._usos_terminal)
+
+    # ---------------------------------------------------
+    # Operaciones básicas (mantienen T, pesos y copy-on-write)
+    # ---------------------------------------------------
+
+    def _contar_terminales(self, produccion: Production, delta: int):
+        for simbolo in produccion:
+            if es_no_terminal(simbolo):
+                continue
+            usos = self._usos_terminal.get(simbolo, 0) + delta
+            if usos > 0:
+                if simbolo not in self._usos_terminal:
+                    self.gramatica.T.add(simbolo)
+                self._usos_terminal[simbolo] = usos
+            else:
+                self._usos_terminal.pop(simbolo, None)
+                self.gramatica.T.discard(simbolo)
+
+    def _producciones(self, A: Symbol) -> Set[Production]:
+        """Conjunto de producciones de A listo para modificarse"""
+        producciones = self.gramatica.P.setdefault(A, set())
+        if id(producciones) in self._compartidos:
+            self._compartidos.discard(id(producciones))
+            producciones = set(producciones)
+            self.gramatica.P[A] = producciones
+        return producciones
+
+    def _agregar(self, A: Symbol, produccion: Production, peso: Optional[float] = None):
+        producciones = self._producciones(A)
+        if produccion not in producciones:
+            producciones.add(produccion)
+            self._contar_terminales(produccion, 1)
+        if peso is not None:
+            clave = (A, produccion)
+            self.gramatica.pesos[clave] = max(self.gramatica.pesos.get(clave, 0.0), peso)
+
+    def _quitar(self, A: Symbol, produccion: Production):
+        producciones = self._producciones(A)
+        if produccion in producciones:
+            producciones.remove(produccion)
+            self._contar_terminales(produccion, -1)
+        self.gramatica.pesos.pop((A, produccion), None)
+
+    def _quitar_no_terminal(self, A: Symbol):
+        for produccion in self.gramatica.P.pop(A, ()):
+            self._contar_terminales(produccion, -1)
+            self.gramatica.pesos.pop((A, produccion), None)
+        self.gramatica.NT.discard(A)
+
+    def _nueva_variable(self, base: str) -> Symbol:
+        """Mismos nombres que _nueva_variable de cnf.py, sin reconstruir el conjunto de usados"""
+        g = self.gramatica
+        k = self._sufijos.get(base, 1)
+        nuevo_simbolo = base if k == 1 else f"{base}_{k}"
+        while nuevo_simbolo in g.NT or nuevo_simbolo in g.T or nuevo_simbolo in g.P:
+            k += 1
+            nuevo_simbolo = f"{base}_{k}"
+        self._sufijos[base] = k
+        g.NT.add(nuevo_simbolo)
+        return nuevo_simbolo
+
+    def _nueva_variable_sin_sufijo(self, base: str) -> Symbol:
+        # Para S0 se vuelve a probar desde la base, como en eliminar_epsilon y cnf
+        self._sufijos.pop(base, None)
+        return self._nueva_variable(base)
+
+    def instantanea(self) -> Gramatica:
+        """
+        Copia de solo lectura del estado actual. Los conjuntos de producciones
+        se comparten y se copian de forma perezosa en la siguiente escritura.
+        """
+        g = self.gramatica
+        copia = Gramatica()
+        copia.NT = set(g.NT)
+        copia.T = set(g.T)
+        copia.S = g.S
+        copia.P = dict(g.P)
+        copia.pesos = dict(g.pesos)
+        self._compartidos.update(id(producciones) for producciones in g.P.values())
+        return copia
+
+    # ---------------------------------------------------
+    # Etapas
+    # ---------------------------------------------------
+
+    def eliminar_epsilon(self):
+        g = self.gramatica
+        anulables = encontrar_anulables(g)
+        pesos_eps = pesos_anulables(g) if g.pesos else {}
+
+        if g.S in anulables:
+            s0 = self._nueva_variable_sin_sufijo("S0")
+            self._agregar(s0, (g.S,))  # S0 -> S (S0 -> ε se descartaría igual)
+            g.S = s0
+
+        # Los pesos de las variantes se calculan con los pesos originales
+        nuevos_pesos: Dict[Tuple[Symbol, Production], float] = {}
+        for A in list(g.P):
+            for produccion in list(g.P[A]):
+                if len(produccion) == 0:
+                    self._quitar(A, produccion)
+                    continue
+
+                pos_anulables: List[int] = [
+                    i for i, simbolo in enumerate(produccion)
+                    if (simbolo in g.NT and simbolo in anulables)
+                ]
+                peso = g.peso(A, produccion) if g.pesos else None
+                if peso is not None:
+                    nuevos_pesos[(A, produccion)] = max(nuevos_pesos.get((A, produccion), 0.0), peso)
+
+                for r in range(1, len(pos_anulables) + 1):
+                    for combo in combinations(pos_anulables, r):
+                        nueva_produccion = tuple(
+                            s for i, s in enumerate(produccion) if i not in combo
+                        )
+                        if len(nueva_produccion) > 0:
+                            self._agregar(A, nueva_produccion)
+                            if peso is not None:
+                                # Peso de la regla por el de derivar ε en lo que se omite
+                                peso_variante = peso
+                                for i in combo:
+                                    peso_variante *= pesos_eps.get(produccion[i], 1.0)
+                                clave = (A, nueva_produccion)
+                                nuevos_pesos[clave] = max(nuevos_pesos.get(clave, 0.0), peso_variante)
+
+        if g.pesos:
+            g.pesos = nuevos_pesos
+
+    def eliminar_unarias(self):
+        g = self.gramatica
+        pares = encontrar_pares_unitarios(g)
+        pesos_pares = pesos_pares_unitarios(g) if g.pesos else {}
+
+        # A hereda las producciones no unarias de cada B con A =>* B
+        for A, B in pares:
+            if A == B:
+                continue
+            for produccion in list(g.P.get(B, ())):
+                if es_produccion_unitaria(produccion, g):
+                    continue
+                peso = None
+                if pesos_pares:
+                    peso = pesos_pares.get((A, B), 1.0) * g.peso(B, produccion)
+                self._agregar(A, produccion, peso)
+
+        for A in list(g.P):
+            for produccion in [p for p in g.P[A] if es_produccion_unitaria(p, g)]:
+                self._quitar(A, produccion)
+        for A in g.NT:
+            g.P.setdefault(A, set())
+
+    def _filtrar_no_terminales(self, conservar: Set[Symbol]):
+        g = self.gramatica
+        for A in [A for A in g.NT | set(g.P) if A not in conservar]:
+            self._quitar_no_terminal(A)
+        for A in list(g.P):
+            invalidas = [p for p in g.P[A]
+                         if any(es_no_terminal(s) and s not in g.NT for s in p)]
+            for produccion in invalidas:
+                self._quitar(A, produccion)
+        # Asegurar el símbolo inicial
+        if g.S is not None and g.S not in g.NT:
+            g.NT.add(g.S)
+            g.P.setdefault(g.S, set())
+
+    def eliminar_simbolos_inutiles(self):
+        self._filtrar_no_terminales(encontrar_no_terminales_productivos(self.gramatica))
+        self._filtrar_no_terminales(encontrar_no_terminales_alcanzables(self.gramatica))
+
+    def convertir_a_cnf(self):
+        g = self.gramatica
+
+        # 1) Nuevo inicio S0 con las producciones de S
+        s0 = self._nueva_variable_sin_sufijo("S0")
+        for produccion in list(g.P.get(g.S, ())):
+            peso = g.pesos.get((g.S, produccion))
+            self._agregar(s0, produccion, peso)
+        g.S = s0
+
+        # 2) Terminales dentro de producciones largas -> variables T_x
+        mapa_terminales: Dict[Symbol, Symbol] = {}
+        for A in list(g.P):
+            for produccion in list(g.P[A]):
+                if len(produccion) < 2 or all(es_no_terminal(s) for s in produccion):
+                    continue
+                nueva: List[Symbol] = []
+                for simbolo in produccion:
+                    if es_no_terminal(simbolo):
+                        nueva.append(simbolo)
+                        continue
+                    if simbolo not in mapa_terminales:
+                        var = self._nueva_variable(f"T_{_sanear_nombre_terminal(simbolo)}")
+                        self._agregar(var, (simbolo,))
+                        mapa_terminales[simbolo] = var
+                    nueva.append(mapa_terminales[simbolo])
+                peso = g.peso(A, produccion) if g.pesos else None
+                self._quitar(A, produccion)
+                self._agregar(A, tuple(nueva), peso)
+
+        # 3) Binarizar A -> X1 X2 ... Xn (n >= 3)
+        for A in list(g.P):
+            for produccion in [p for p in g.P[A] if len(p) > 2]:
+                peso = g.pesos.get((A, produccion))
+                self._quitar(A, produccion)
+                simbolos = list(produccion)
+                izquierda_actual = A
+                while len(simbolos) > 2:
+                    Z = self._nueva_variable("X")
+                    g.P.setdefault(Z, set())
+                    self._agregar(izquierda_actual, (simbolos[0], Z),
+                                  peso if izquierda_actual == A else None)
+                    izquierda_actual = Z
+                    simbolos = simbolos[1:]
+                self._agregar(izquierda_actual, (simbolos[0], simbolos[1]))
+
+        # 4) Asegurar que todas las claves de P existan
+        for A in g.NT:
+            g.P.setdefault(A, set())
+
+    def ejecutar(self, mostrar: Optional[Callable[[str, Gramatica], None]] = None,
+                 conservar: Tuple[str, ...] = ()) -> Dict[str, Gramatica]:
+        """
+        Ejecuta todas las etapas en orden.
+
+        Args:
+            mostrar: callback(nombre_etapa, gramatica_de_trabajo) tras cada etapa;
+                     recibe la gramática viva, así que debe usarse en el momento
+            conservar: nombres de etapas (ver ETAPAS) de las que se quiere una
+                       instantánea copy-on-write
+
+        Returns:
+            Diccionario etapa -> instantánea para las etapas pedidas en conservar
+        """
+        instantaneas: Dict[str, Gramatica] = {}
+        etapas = {
+            "epsilon": self.eliminar_epsilon,
+            "unarias": self.eliminar_unarias,
+            "inutiles": self.eliminar_simbolos_inutiles,
+            "cnf": self.convertir_a_cnf,
+        }
+        for nombre in ETAPAS:
+            etapas[nombre]()
+            if nombre in conservar:
+                instantaneas[nombre] = self.instantanea()
+            if mostrar is not None:
+                mostrar(nombre, self.gramatica)
+        return instantaneas
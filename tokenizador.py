@@ -0,0 +1,142 @@
+# tokenizador.py
+# Etapa léxica de CYK: tokenizadores intercambiables y un índice precompilado
+# terminal -> no terminales, para que el paso 1 sea una búsqueda por palabra.
+
+import io
+import math
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from gramatica import Gramatica, Symbol
+
+
+class Tokenizador(ABC):
+    """
+    Tokenizador base (abstracto). Las subclases implementan tokens(), que
+    genera los tokens uno a uno; con minusculas=True (por defecto, como antes)
+    cada token se pasa a minúsculas, y con minusculas=False se respeta tal cual.
+    """
+    def __init__(self, minusculas: bool = True):
+        self.minusculas = minusculas
+
+    def normalizar(self, token: str) -> str:
+        return token.lower() if self.minusculas else token
+
+    @abstractmethod
+    def tokens(self, cadena: str) -> Iterator[str]:
+        """Genera los tokens de la cadena ya normalizados"""
+
+    def tokenizar(self, cadena: str) -> List[str]:
+        return list(self.tokens(cadena))
+
+
+class TokenizadorEspacios(Tokenizador):
+    """Palabras separadas por espacios en blanco (comportamiento original)"""
+    def tokens(self, cadena: str) -> Iterator[str]:
+        for token in cadena.split():
+            yield self.normalizar(token)
+
+
+class TokenizadorRegex(Tokenizador):
+    """
+    Cada coincidencia del patrón es un token. Por ejemplo, r"\\w+|[^\\w\\s]"
+    separa la puntuación: "she eats, a cake." -> she eats , a cake .
+    """
+    def __init__(self, patron: str = r"\S+", minusculas: bool = True):
+        super().__init__(minusculas)
+        self.patron = re.compile(patron)
+
+    def tokens(self, cadena: str) -> Iterator[str]:
+        for coincidencia in self.patron.finditer(cadena):
+            yield self.normalizar(coincidencia.group())
+
+
+class TokenizadorStream(Tokenizador):
+    """
+    Tokens separados por espacios leídos de un stream por bloques, sin cargar
+    todo el texto en memoria. Un token cortado entre dos bloques se une antes
+    de emitirse.
+    """
+    def __init__(self, minusculas: bool = True, tamano_bloque: int = 1 << 16):
+        super().__init__(minusculas)
+        self.tamano_bloque = tamano_bloque
+
+    def tokens(self, fuente: Union[str, TextIO]) -> Iterator[str]:
+        if isinstance(fuente, str):
+            fuente = io.StringIO(fuente)
+        pendiente = ""
+        while True:
+            bloque = fuente.read(self.tamano_bloque)
+            if not bloque:
+                break
+            partes = (pendiente + bloque).split()
+            # Si el bloque no termina en espacio, el último token puede seguir
+            if partes and not bloque[-1].isspace():
+                pendiente = partes.pop()
+            else:
+                pendiente = ""
+            for token in partes:
+                yield self.normalizar(token)
+        if pendiente:
+            yield self.normalizar(pendiente)
+
+
+class IndiceLexico:
+    """
+    Índice precompilado de las reglas de una gramática CNF, para no recorrer P
+    (ni el léxico) en cada análisis:
+      no_terminales[a] = [A, ...]             para A -> a
+      lexicas[a]       = [(A, log p), ...]    para A -> a
+      binarias[B]      = [(A, C, log p), ...] para A -> B C
+      reglas_binarias  = [(A, B, C), ...]     en el orden de P (usado por cyk())
+
+    Con minusculas=True (por defecto, como el tokenizador) las claves se
+    guardan en minúsculas, para que coincidan con los tokens aunque la
+    gramática tenga terminales con mayúsculas.
+    """
+    def __init__(self, gramatica: Gramatica, minusculas: bool = True):
+        self.minusculas = minusculas
+        self.no_terminales: Dict[str, List[Symbol]] = {}
+        self.lexicas: Dict[str, List[Tuple[Symbol, float]]] = {}
+        self.binarias: Dict[Symbol, List[Tuple[Symbol, Symbol, float]]] = {}
+        self.reglas_binarias: List[Tuple[Symbol, Symbol, Symbol]] = []
+        # log p de cada (terminal, A); si dos terminales coinciden al pasar a
+        # minúsculas se queda el de mayor peso
+        log_pesos: Dict[str, Dict[Symbol, float]] = {}
+        for A, producciones in gramatica.P.items():
+            for produccion in producciones:
+                if len(produccion) == 2:
+                    B, C = produccion
+                    log_p = math.log(gramatica.peso(A, produccion))
+                    self.binarias.setdefault(B, []).append((A, C, log_p))
+                    self.reglas_binarias.append((A, B, C))
+                elif len(produccion) == 1 and produccion[0] not in gramatica.NT:
+                    terminal = produccion[0].lower() if minusculas else produccion[0]
+                    log_p = math.log(gramatica.peso(A, produccion))
+                    por_A = log_pesos.setdefault(terminal, {})
+                    por_A[A] = max(por_A.get(A, log_p), log_p)
+        for terminal, por_A in log_pesos.items():
+            self.no_terminales[terminal] = list(por_A)
+            self.lexicas[terminal] = list(por_A.items())
+
+    def buscar(self, token: str) -> List[Symbol]:
+        """No terminales que generan el token (lista vacía si es desconocido)"""
+        return self.no_terminales.get(token, [])
+
+    def desconocidos(self, palabras: List[str]) -> List[Tuple[int, str]]:
+        """(posición, token) de cada token que ninguna regla A -> a genera"""
+        return [(i, palabra) for i, palabra in enumerate(palabras)
+                if palabra not in self.no_terminales]
+
+
+def indice_para(gramatica: Gramatica, tokenizador: Optional[Tokenizador] = None) -> IndiceLexico:
+    """Índice con el mismo plegado de mayúsculas que el tokenizador (por defecto, minúsculas)"""
+    return IndiceLexico(gramatica, minusculas=tokenizador.minusculas if tokenizador is not None else True)
+
+
+def tokenizar(cadena: str, tokenizador: Optional[Tokenizador] = None) -> List[str]:
+    """Tokens de la cadena; sin tokenizador, espacios en blanco y minúsculas"""
+    if tokenizador is None:
+        return cadena.strip().lower().split()
+    return tokenizador.tokenizar(cadena)